@@ -0,0 +1,169 @@
+"""
+Drive the API in-process with realistic request mixes and report latency percentiles, throughput and
+database queries per request.
+
+Usage (after seeding, see benchmarks/seed.py):
+    DATABASE_URL=postgresql+asyncpg://postgres@localhost/naec_bench \\
+        python -m backend.benchmarks.run --endpoint analysis --requests 2000 --concurrency 20
+
+--endpoint selects POST /analysis, GET /faculties or a mix of both, so a change in query_helpers
+shows up as numbers for the endpoint it affects. Response caches are bypassed unless --with-caches is given,
+and --db-search serves GET /faculties from Postgres instead of the in-memory catalog.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+from sqlalchemy import event, text
+
+from backend import config, constants
+from backend.db import engine, AsyncSessionLocal
+from backend.main import app
+from backend.routers import analysis as analysis_router, faculties as faculties_router
+from backend.toolkit import metrics
+from backend.toolkit.warmup import readiness
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args) -> None:
+        self.count += 1
+
+
+async def load_faculties_by_combination() -> Dict[frozenset, List[Tuple[str, int]]]:
+    """
+    (faculty_id, year) pairs grouped by the exact subject combination they admit, so that generated
+    analysis requests only pick faculties matching the student's subjects.
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(text("""
+            SELECT faculty_id, year, array_agg(subject_name) AS subjects
+            FROM faculty_year_subjects
+            GROUP BY faculty_id, year
+        """))
+        faculties: Dict[frozenset, List[Tuple[str, int]]] = {}
+        for faculty_id, year, subjects in result.fetchall():
+            faculties.setdefault(frozenset(subjects), []).append((faculty_id, year))
+        return faculties
+
+
+def analysis_request(rng: random.Random, faculties: Dict[frozenset, List[Tuple[str, int]]]) -> Tuple[str, str, Dict]:
+    combination = rng.choice([c for c in constants.ALLOWED_SUBJECT_COMBINATIONS if faculties.get(c)])
+    points = {subject: round(rng.uniform(0.3, 1.0), 2) for subject in combination}
+    candidates = faculties[combination]
+    chosen = rng.sample(candidates, min(len(candidates), rng.randint(1, 20)))
+    body = {"points": points, "faculties": [{"faculty_id": f, "year": y} for f, y in chosen]}
+    return "POST", "/analysis", {"json": body}
+
+
+def faculties_request(rng: random.Random, _) -> Tuple[str, str, Dict]:
+    electives = [s for s in constants.SUBJECT_POINTS if s not in {"GEORGIAN LANGUAGE", "FOREIGN LANGUAGE"}]
+    subjects = rng.sample(electives, rng.choice((1, 1, 2)))
+    params: Dict[str, Any] = {"subjects": ",".join(subjects), "page": rng.choice((1, 1, 1, 2, 3, 10))}
+    if rng.random() < 0.3:
+        params["university"] = rng.choice(("univ", "university 1", "1"))
+    if rng.random() < 0.3:
+        params["faculty"] = rng.choice(("faculty", "math", "bio", "10"))
+    if rng.random() < 0.5:
+        params["year"] = rng.choice((2021, 2022, 2023, 2024))
+    return "GET", "/faculties", {"params": params}
+
+
+GENERATORS: Dict[str, List[Callable]] = {
+    "analysis": [analysis_request],
+    "faculties": [faculties_request],
+    "mixed": [analysis_request, faculties_request, faculties_request],
+}
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run(
+        endpoint: str,
+        n_requests: int,
+        concurrency: int,
+        with_caches: bool,
+        db_search: bool,
+        random_seed: int
+) -> None:
+    rng = random.Random(random_seed)
+    counter = QueryCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+
+    async with app.router.lifespan_context(app):
+        while not readiness.ready:
+            await asyncio.sleep(0.05)
+        faculties = await load_faculties_by_combination()
+        generators = GENERATORS[endpoint]
+        planned = [rng.choice(generators)(rng, faculties) for _ in range(n_requests)]
+
+        if db_search:
+            config.FACULTY_CATALOG_ENABLED = False
+        if not with_caches:
+            analysis_router.result_cache.max_entries = 0
+            faculties_router.response_cache.max_entries = 0
+
+        latencies: Dict[str, List[float]] = {}
+        statuses: Dict[int, int] = {}
+        queue: asyncio.Queue = asyncio.Queue()
+        for request in planned:
+            queue.put_nowait(request)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def worker():
+                while not queue.empty():
+                    method, path, kwargs = queue.get_nowait()
+                    started = time.perf_counter()
+                    response = await client.request(method, path, **kwargs)
+                    latencies.setdefault(f"{method} {path}", []).append(time.perf_counter() - started)
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+            counter.count = 0
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"{total} requests in {elapsed:.2f}s at concurrency {concurrency}: {total / elapsed:.1f} req/s")
+    print(f"status codes: {dict(sorted(statuses.items()))}")
+    print(f"queries/request: {counter.count / max(total, 1):.2f}")
+    report = metrics.prepared_statement_report()
+    if report:
+        hits = sum(entry["hits"] for entry in report.values())
+        lookups = hits + sum(entry["misses"] for entry in report.values())
+        print(f"prepared statement cache: {hits / lookups:.1%} hits over {lookups:g} statements")
+        for name, entry in sorted(report.items(), key=lambda item: item[1]["hit_rate"]):
+            print(f"  {entry['hit_rate']:6.1%}  {entry['hits'] + entry['misses']:>7g}  {name}")
+    for name, values in sorted(latencies.items()):
+        values.sort()
+        print(
+            f"  {name:<16} n={len(values):<6} "
+            f"mean={statistics.mean(values) * 1000:7.2f}ms "
+            f"p50={percentile(values, 50) * 1000:7.2f}ms "
+            f"p95={percentile(values, 95) * 1000:7.2f}ms "
+            f"p99={percentile(values, 99) * 1000:7.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the API against a seeded database.")
+    parser.add_argument("--endpoint", choices=sorted(GENERATORS), default="mixed")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--with-caches", action="store_true", help="Keep response/result caches enabled")
+    parser.add_argument("--db-search", action="store_true", help="Serve GET /faculties from Postgres, not the catalog")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for the request mix")
+    args = parser.parse_args()
+    asyncio.run(run(args.endpoint, args.requests, args.concurrency, args.with_caches, args.db_search, args.seed))
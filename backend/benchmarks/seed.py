@@ -0,0 +1,201 @@
+"""
+Seed a local Postgres database with synthetic exam, grant, faculty, enrollment and result data.
+
+The schema mirrors what the API queries (including faculties_materialized_view) and the SQL files in
+backend/migrations are applied on top. Point DATABASE_URL at a throwaway database: existing tables are dropped.
+
+Usage:
+    DATABASE_URL=postgresql+asyncpg://postgres@localhost/naec_bench \\
+        python -m backend.benchmarks.seed --faculties 2000 --students 50000
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+
+from backend import constants
+from backend.db import engine
+
+
+YEARS = (2021, 2022, 2023, 2024)
+GRANT_SUBJECTS = [s for s in constants.SUBJECT_POINTS if s not in {"GEORGIAN LANGUAGE", "FOREIGN LANGUAGE"}]
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "migrations")
+
+SCHEMA = """
+DROP MATERIALIZED VIEW IF EXISTS faculties_materialized_view;
+DROP TABLE IF EXISTS result, enrollment, faculty_year_subjects, faculty, "grant", exam CASCADE;
+
+CREATE TABLE exam (
+    subject_name TEXT NOT NULL,
+    year INT NOT NULL,
+    mean DOUBLE PRECISION NOT NULL,
+    standard_deviation DOUBLE PRECISION NOT NULL,
+    max_score DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (subject_name, year)
+);
+
+CREATE TABLE "grant" (
+    id SERIAL PRIMARY KEY,
+    subject_name TEXT NOT NULL,
+    year INT NOT NULL,
+    grant_score DOUBLE PRECISION NOT NULL,
+    grant_amount INT NOT NULL
+);
+CREATE INDEX grant_subject_year_score_idx ON "grant" (subject_name, year, grant_score);
+
+CREATE TABLE faculty (
+    id TEXT NOT NULL,
+    year INT NOT NULL,
+    name TEXT NOT NULL,
+    university_id TEXT NOT NULL,
+    university_name TEXT NOT NULL,
+    capacity INT NOT NULL,
+    PRIMARY KEY (id, year)
+);
+
+CREATE TABLE faculty_year_subjects (
+    faculty_id TEXT NOT NULL,
+    year INT NOT NULL,
+    subject_name TEXT NOT NULL,
+    weight DOUBLE PRECISION NOT NULL,
+    seats INT,
+    is_required BOOLEAN NOT NULL,
+    PRIMARY KEY (faculty_id, year, subject_name)
+);
+
+CREATE TABLE enrollment (
+    student_id INT PRIMARY KEY,
+    faculty_id TEXT NOT NULL,
+    year INT NOT NULL,
+    contest_score DOUBLE PRECISION
+);
+CREATE INDEX enrollment_faculty_year_idx ON enrollment (faculty_id, year);
+
+CREATE TABLE result (
+    enrollment_id INT NOT NULL REFERENCES enrollment (student_id),
+    subject_name TEXT NOT NULL,
+    PRIMARY KEY (enrollment_id, subject_name)
+);
+
+CREATE MATERIALIZED VIEW faculties_materialized_view AS
+SELECT
+    f.year,
+    f.id AS faculty_id,
+    f.name AS faculty_name,
+    f.university_id,
+    f.university_name,
+    string_agg(fys.subject_name, ',' ORDER BY fys.subject_name) AS subjects,
+    COUNT(*) FILTER (WHERE fys.is_required) AS required_count,
+    COUNT(*) FILTER (WHERE NOT fys.is_required) AS elective_count,
+    COUNT(*) AS total_subjects_count
+FROM faculty f
+JOIN faculty_year_subjects fys ON fys.faculty_id = f.id AND fys.year = f.year
+GROUP BY f.year, f.id, f.name, f.university_id, f.university_name;
+"""
+
+
+def build_data(n_faculties: int, n_students: int, n_grants: int, rng: random.Random) -> Dict[str, List[Dict[str, Any]]]:
+    data: Dict[str, List[Dict[str, Any]]] = {
+        "exam": [], "grant": [], "faculty": [], "faculty_year_subjects": [], "enrollment": [], "result": []
+    }
+
+    for subject, max_score in constants.SUBJECT_POINTS.items():
+        for year in YEARS:
+            data["exam"].append({
+                "subject_name": subject, "year": year,
+                "mean": max_score * rng.uniform(0.45, 0.6),
+                "standard_deviation": max_score * rng.uniform(0.15, 0.22),
+                "max_score": max_score,
+            })
+
+    for subject in GRANT_SUBJECTS:
+        for year in YEARS:
+            for _ in range(n_grants):
+                grant_score = rng.gauss(1650, 180)
+                amount = 100 if grant_score > 2000 else 70 if grant_score > 1850 else 50
+                data["grant"].append({
+                    "subject_name": subject, "year": year, "grant_score": round(grant_score, 2), "grant_amount": amount
+                })
+
+    combinations = [sorted(c) for c in constants.ALLOWED_SUBJECT_COMBINATIONS]
+    n_universities = max(1, n_faculties // 20)
+    faculty_keys = []
+    for i in range(n_faculties):
+        faculty_id = str(1000 + i)
+        university = i % n_universities
+        combination = rng.choice(combinations)
+        for year in YEARS:
+            faculty_keys.append((faculty_id, year, combination))
+            data["faculty"].append({
+                "id": faculty_id, "year": year,
+                "name": f"Faculty of {rng.choice(GRANT_SUBJECTS).title()} {i}",
+                "university_id": str(100 + university),
+                "university_name": f"University {university}",
+                "capacity": rng.randint(20, 400),
+            })
+            for subject in combination:
+                elective = subject not in {"GEORGIAN LANGUAGE", "FOREIGN LANGUAGE"} and not (
+                    len(combination) == 4 and subject == "BIOLOGY")
+                data["faculty_year_subjects"].append({
+                    "faculty_id": faculty_id, "year": year, "subject_name": subject,
+                    "weight": rng.choice((2.0, 3.0, 4.0)) if elective else 1.0,
+                    "seats": None, "is_required": not elective,
+                })
+
+    for student_id in range(1, n_students + 1):
+        faculty_id, year, combination = rng.choice(faculty_keys)
+        data["enrollment"].append({
+            "student_id": student_id, "faculty_id": faculty_id, "year": year,
+            "contest_score": round(rng.gauss(900, 150), 2),
+        })
+        for subject in combination:
+            data["result"].append({"enrollment_id": student_id, "subject_name": subject})
+
+    return data
+
+
+async def seed(n_faculties: int, n_students: int, n_grants: int, random_seed: int) -> None:
+    started = time.perf_counter()
+    data = build_data(n_faculties, n_students, n_grants, random.Random(random_seed))
+
+    async with engine.begin() as conn:
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.execute(SCHEMA)
+
+        for table, rows in data.items():
+            if not rows:
+                continue
+            columns = list(rows[0].keys())
+            quoted = '"grant"' if table == "grant" else table
+            await conn.execute(
+                text(f"INSERT INTO {quoted} ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})"),
+                rows
+            )
+            print(f"  {table}: {len(rows)} rows")
+
+        await conn.execute(text("REFRESH MATERIALIZED VIEW faculties_materialized_view"))
+
+        for name in sorted(os.listdir(MIGRATIONS_DIR)):
+            if name.endswith(".sql"):
+                with open(os.path.join(MIGRATIONS_DIR, name)) as f:
+                    await raw.driver_connection.execute(f.read())
+                print(f"  applied {name}")
+
+        await conn.execute(text("ANALYZE"))
+
+    await engine.dispose()
+    print(f"Seeded in {time.perf_counter() - started:.1f}s.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed a benchmark database with synthetic data.")
+    parser.add_argument("--faculties", type=int, default=1000, help="Faculties per year")
+    parser.add_argument("--students", type=int, default=50000, help="Enrolled students across all years")
+    parser.add_argument("--grants", type=int, default=2000, help="Grant rows per subject and year")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+    asyncio.run(seed(args.faculties, args.students, args.grants, args.seed))
@@ -0,0 +1,125 @@
+"""
+Compare response serialization costs: building response models and dumping them (the old path) against
+encoding lean row tuples directly (FAST_JSON_RESPONSES). No database is needed; rows are synthetic.
+
+Usage:
+    DATABASE_URL=postgresql+asyncpg://unused python -m backend.benchmarks.serialization --repeat 2000
+
+Reports microseconds per response for a 20-faculty POST /analysis response and a full GET /faculties page,
+and checks that both paths produce byte-identical JSON.
+"""
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from backend import config
+from backend.models import analysis as analysis_models, faculties as faculties_models
+from backend.toolkit import serialization
+
+
+def analysis_rows(rng: random.Random, faculties: int):
+    # Types as they come from the database and services: TEXT faculty ids, INT years, DOUBLE scores
+    grants = [
+        (year, [(subject, round(rng.uniform(1000, 7000), 2), rng.choice([0, 50, 70, 100]))
+                for subject in ("MATHEMATICS",)])
+        for year in (2021, 2022, 2023, 2024)
+    ]
+    enrollments = [
+        (
+            str(1000 + i), 2024, round(rng.uniform(400, 900), 2),
+            {"faculty_id": str(1000 + i), "year": 2024, "min_score": 512.3, "max_score": 871.9},
+            rng.randint(1, 300), 300, 120, 40
+        )
+        for i in range(faculties - 1)
+    ]
+    # A faculty nobody enrolled in: no min/max score
+    enrollments.append((str(999 + faculties), 2024, 640.5, {
+        "faculty_id": str(999 + faculties), "year": 2024, "min_score": None, "max_score": None
+    }, 1, 0, 120, 40))
+    return grants, enrollments
+
+
+def faculty_rows(rng: random.Random, count: int):
+    return [
+        (
+            2024, str(2000 + i), f"Faculty of Sciences {i}", str(10 + i % 7), f"State University {i % 7}",
+            ["GEORGIAN LANGUAGE", "FOREIGN LANGUAGE", "MATHEMATICS"]
+        )
+        for i in range(count)
+    ]
+
+
+def analysis_via_models(grants, enrollments) -> bytes:
+    return analysis_models.AnalyzeResponse(
+        grants=[
+            analysis_models.YearlyGrantResult(
+                year=year,
+                grants=[
+                    analysis_models.SubjectGrant(subject=s, grant_score=score, grant_amount=amount)
+                    for s, score, amount in subject_grants
+                ]
+            )
+            for year, subject_grants in grants
+        ],
+        enrollments=[
+            analysis_models.EnrollmentResult(**dict(zip(serialization.ENROLLMENT_RESULT_FIELDS, row)))
+            for row in enrollments
+        ]
+    ).model_dump_json().encode()
+
+
+def faculties_via_models(items) -> bytes:
+    return faculties_models.PaginatedFacultyResponse(
+        items=[faculties_models.FacultyItem(**dict(zip(serialization.FACULTY_ITEM_FIELDS, item))) for item in items],
+        total=1234,
+        limit=config.LIMIT_PER_PAGE,
+        next_cursor="cursor",
+        total_is_estimate=False,
+    ).model_dump_json().encode()
+
+
+def measure(fn: Callable[[], bytes], repeat: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1_000_000
+
+
+def report(name: str, before: Callable[[], bytes], after: Callable[[], bytes], repeat: int) -> None:
+    if before() != after():
+        raise SystemExit(f"{name}: fast path output differs from the model output:\n{before()!r}\n{after()!r}")
+    before_us, after_us = measure(before, repeat), measure(after, repeat)
+    print(f"{name:<28} models {before_us:8.1f} us   lean {after_us:8.1f} us   "
+          f"x{before_us / after_us:5.1f}   {len(after())} bytes")
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--faculties", type=int, default=20, help="Faculties per analysis response")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(42)
+    print(f"encoder: {'orjson' if serialization.orjson is not None else 'json (orjson not installed)'}")
+
+    grants, enrollments = analysis_rows(rng, args.faculties)
+    report(
+        f"analysis ({args.faculties} faculties)",
+        lambda: analysis_via_models(grants, enrollments),
+        lambda: serialization.encode_analyze_response(grants, enrollments),
+        args.repeat
+    )
+
+    items = faculty_rows(rng, config.LIMIT_PER_PAGE)
+    report(
+        f"faculties ({len(items)} per page)",
+        lambda: faculties_via_models(items),
+        lambda: serialization.encode_faculty_page(items, 1234, config.LIMIT_PER_PAGE, "cursor", False),
+        args.repeat
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,55 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from fastapi import HTTPException, status
 from backend import config
+from backend.toolkit.data_version import data_version
+from backend.toolkit.metrics import InstrumentedQueuePool, instrument_engine
+from backend.toolkit.replicas import Replica, ReplicaRouter
 
-engine = create_async_engine(
-    config.DATABASE_URL,
-    echo=False,
-    pool_size=config.DB_POOL_SIZE,
-    max_overflow=config.DB_MAX_OVERFLOW,
-    pool_timeout=config.DB_POOL_TIMEOUT,
-    pool_recycle=config.DB_POOL_RECYCLE,
-    pool_pre_ping=True
-)
+
+def create_engine(url: str, name: str, **options) -> AsyncEngine:
+    # The asyncpg dialect prepares every statement and caches it per connection by SQL string; statements from
+    # toolkit.statements always render identically, so the cache only has to hold the registry (including the
+    # fixed set of faculty search shapes) to avoid re-parsing and re-planning on the hot paths.
+    # asyncpg's own statement cache is unused by SQLAlchemy (it calls prepare() itself), so it is disabled.
+    connect_args = {}
+    if url.startswith("postgresql+asyncpg"):
+        connect_args = {
+            "prepared_statement_cache_size": config.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": 0,
+        }
+
+    new_engine = create_async_engine(
+        url,
+        echo=False,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        poolclass=InstrumentedQueuePool,
+        connect_args=connect_args,
+        **options
+    )
+    instrument_engine(new_engine, name)
+    return new_engine
+
+
+def read_sessionmaker(bind: AsyncEngine) -> async_sessionmaker:
+    # Autocommit: no BEGIN, and no COMMIT/ROLLBACK when the session closes, for sessions that only read
+    return async_sessionmaker(
+        autoflush=False,
+        bind=bind.execution_options(isolation_level="AUTOCOMMIT"),
+        class_=AsyncSession,
+        expire_on_commit=False
+    )
+
+
+engine = create_engine(config.DATABASE_URL, "primary")
 
 
 AsyncSessionLocal = async_sessionmaker(
@@ -21,12 +60,82 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False
 )
 
+replica_router = ReplicaRouter(
+    primary=Replica("primary", engine, read_sessionmaker(engine)),
+    replicas=[
+        Replica(name, replica_engine, read_sessionmaker(replica_engine))
+        for name, replica_engine in (
+            (f"replica-{i}", create_engine(url, f"replica-{i}"))
+            for i, url in enumerate(config.DATABASE_REPLICA_URLS)
+        )
+    ],
+    strategy=config.REPLICA_ROUTING,
+    retry_seconds=config.REPLICA_RETRY_SECONDS
+)
+
+# Session factory for read-only work outside request dependencies (concurrent chunks, single-flight, streams)
+read_session = replica_router.session
+
+
+def engines() -> Dict[str, AsyncEngine]:
+    """
+    Every engine by pool name: the primary and each replica.
+    """
+    return {"primary": engine, **{replica.name: replica.engine for replica in replica_router.replicas}}
+
+
+def replicas_may_lag() -> bool:
+    """
+    True shortly after a data version change when replicas are configured: a replica may not have replayed
+    the new data yet, so results read from it must not be cached under the new version.
+    """
+    return bool(replica_router.replicas) and data_version.changed_within(config.REPLICA_MAX_LAG_SECONDS)
+
+
+def pool_exhausted() -> HTTPException:
+    # No connection within DB_POOL_TIMEOUT: the same answer as a request shed by admission control
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Server is busy, retry shortly.",
+        headers={"Retry-After": str(config.ADMISSION_RETRY_AFTER)}
+    )
+
+
+# What a failing read can raise from the database or the pool, as opposed to errors in the calling code
+DATABASE_ERRORS = (exc.SQLAlchemyError, OSError, asyncio.TimeoutError)
+
+
+@asynccontextmanager
+async def read_db() -> AsyncIterator[AsyncSession]:
+    """
+    Read session for routers that open one themselves instead of depending on get_read_db, with the same
+    answers on database errors: 429 when no connection frees up within DB_POOL_TIMEOUT, 503 otherwise.
+    """
+    try:
+        async with read_session() as session:
+            yield session
+    except exc.TimeoutError:
+        raise pool_exhausted()
+    except DATABASE_ERRORS as e:
+        print(f"Database read error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database service unavailable or transaction failed."
+        )
+
 
 async def get_db() -> AsyncSession:
     session = AsyncSessionLocal()
     try:
         yield session
         await session.commit()
+    except HTTPException:
+        # Errors raised deliberately by the routers (e.g. 400 on bad input) keep their status
+        await session.rollback()
+        raise
+    except exc.TimeoutError:
+        await session.rollback()
+        raise pool_exhausted()
     except Exception as e:
         await session.rollback()
         print(f"Database transaction error: {e}")
@@ -35,4 +144,24 @@ async def get_db() -> AsyncSession:
             detail="Database service unavailable or transaction failed."
         )
     finally:
-        await session.close()
\ No newline at end of file
+        await session.close()
+
+
+async def get_read_db() -> AsyncSession:
+    """
+    Read-only session on a replica (or the primary as fallback). Nothing is committed, so there is no
+    transaction round trip at the end of the request.
+    """
+    async with read_session() as session:
+        try:
+            yield session
+        except HTTPException:
+            raise
+        except exc.TimeoutError:
+            raise pool_exhausted()
+        except Exception as e:
+            print(f"Database read error: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database service unavailable or transaction failed."
+            )
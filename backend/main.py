@@ -1,4 +1,5 @@
 import sys
+import asyncio
 
 from sqlalchemy import text
 from contextlib import asynccontextmanager
@@ -6,18 +7,36 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend.routers import faculties, analysis
+from backend.routers import faculties, analysis, grants, health, metrics as metrics_router
 from backend import config
 
-from backend.db import engine
+from backend import db
+from backend.db import engine, AsyncSessionLocal
+from backend.toolkit.exam_cache import exam_stats_cache
+from backend.toolkit.grant_index import grant_index
+from backend.toolkit.faculty_catalog import faculty_catalog
+from backend.toolkit.contest_score_index import contest_score_index
+from backend.toolkit.weight_matrix import faculty_weight_matrix
+from backend.toolkit.data_version import data_version
+from backend.toolkit import snapshot, metrics, single_flight, admission
+from backend.toolkit.warmup import readiness, warm_up
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     """
     Handles startup and shutdown events for the FastAPI application.
-    Initializes and disposes of the database connection pool.
+    Initializes and disposes of the database connection pool and warms the pool and reference data caches.
     """
+    if config.SNAPSHOT_PATH:
+        # Analysis runs entirely off the memory-mapped snapshot; the database is only needed for /faculties
+        try:
+            data_snapshot = snapshot.activate_snapshot(config.SNAPSHOT_PATH)
+            print(f"Serving analysis from data snapshot {data_snapshot.path}.")
+        except Exception as e:
+            print(f"ERROR: Failed to open data snapshot {config.SNAPSHOT_PATH}: {e}")
+            sys.exit(1)
+
     print("Application starting up... Initializing database pool.")
     try:
         async with engine.connect() as connection:
@@ -25,23 +44,108 @@ async def lifespan(_: FastAPI):
         print("Database connection test successful.")
     except Exception as e:
         print(f"ERROR: Database connection test failed during startup: {e}")
-        sys.exit(1)
+        if not config.SNAPSHOT_PATH:
+            sys.exit(1)
+
+    # Warm-up runs in the background: the server starts answering (GET /ready reports 503) while pool
+    # connections are opened and reference data loads, and only reports ready once everything is warm
+    loaders = []
+    if not config.SNAPSHOT_PATH:
+        loaders += [
+            ("exam_stats", exam_stats_cache.refresh),
+            ("grant_index", grant_index.refresh),
+            ("weight_matrix", faculty_weight_matrix.refresh),
+            ("data_version", load_data_version),
+        ]
+    if config.FACULTY_CATALOG_ENABLED:
+        loaders.append(("faculty_catalog", build_faculty_catalog))
+
+    # With a snapshot the database only backs /faculties, so no connections are opened ahead of use (and the
+    # warm statements would need migrations a snapshot deployment may not have)
+    warm_engines = {} if config.SNAPSHOT_PATH else db.engines()
+
+    tasks = []
+
+    async def start():
+        await warm_up(readiness, warm_engines, AsyncSessionLocal, config.WARMUP_POOL_CONNECTIONS, loaders)
+        if not config.SNAPSHOT_PATH:
+            # A snapshot is immutable; new data arrives as a new snapshot file and a restart
+            data_version.on_change(reload_caches)
+            tasks.append(asyncio.create_task(data_version.watch(AsyncSessionLocal, config.DATA_VERSION_POLL_SECONDS)))
+
+    tasks.append(asyncio.create_task(start()))
+    if db.replica_router.replicas:
+        tasks.append(asyncio.create_task(db.replica_router.watch(config.REPLICA_PROBE_SECONDS)))
 
     yield
 
-    print("Application shutting down... Disposing database engine.")
-    await engine.dispose()
+    for task in tasks:
+        task.cancel()
+    print("Application shutting down... Disposing database engines.")
+    for pool_engine in db.engines().values():
+        await pool_engine.dispose()
+
+
+async def load_data_version(session):
+    data_version.version = await data_version.fetch(session)
+    print(f"Data version: {data_version.version}.")
+
+
+async def build_faculty_catalog(session):
+    # Not fatal if it fails: GET /faculties falls back to querying the database
+    stats = await faculty_catalog.refresh(session)
+    print(
+        f"Faculty catalog built ({stats['rows']} rows in {stats['build_seconds']}s, "
+        f"~{stats['memory_bytes'] / 1024 / 1024:.1f} MiB)."
+    )
+
+
+async def reload_caches(session):
+    """
+    Rebuilds in-memory data after the data version changed (new admission data or a view refresh).
+    Cached HTTP responses are keyed on the data version, so they go stale on their own.
+    """
+    contest_score_index.invalidate()
+    await exam_stats_cache.refresh(session)
+    await grant_index.refresh(session)
+    await faculty_weight_matrix.refresh(session)
+    if config.FACULTY_CATALOG_ENABLED:
+        await faculty_catalog.refresh(session)
+    faculties.response_cache.clear()
+    analysis.result_cache.clear()
 
 
 app = FastAPI(lifespan=lifespan)
 
 app.include_router(faculties.router, prefix="/faculties", tags=["Faculties"])
 app.include_router(analysis.router, prefix="/analysis", tags=["Analysis"])
+app.include_router(grants.router, prefix="/grants", tags=["Grants"])
+app.include_router(metrics_router.router, prefix="/metrics", tags=["Metrics"])
+app.include_router(health.router, tags=["Health"])
+
+if config.ADMISSION_ENABLED:
+    # Inside CORS and metrics, so 429s carry CORS headers and are counted
+    app.add_middleware(
+        admission.AdmissionMiddleware,
+        controller=admission.admission_controller,
+        retry_after=config.ADMISSION_RETRY_AFTER
+    )
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=config.ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["Server-Timing", "ETag", "Retry-After"]
 )
+
+app.add_middleware(metrics.MetricsMiddleware)
+
+metrics.collectors.append(lambda: metrics.cache_gauges("faculties_responses", faculties.response_cache.stats()))
+metrics.collectors.append(lambda: metrics.cache_gauges("analysis_results", analysis.result_cache.stats()))
+metrics.collectors.append(single_flight.flight_requests.render)
+metrics.collectors.append(lambda: faculties.search_flight.gauges() + analysis.analysis_flight.gauges())
+metrics.collectors.append(lambda: metrics.gauge("app_ready", "1 once startup warm-up has completed.", readiness.ready))
+metrics.collectors.append(db.replica_router.gauges)
+metrics.collectors.append(admission.admission_controller.gauges)
@@ -0,0 +1,26 @@
+-- Indexes backing GET /faculties keyset pagination and substring search.
+-- faculties_materialized_view is filtered with LIKE '%...%' on names, ids and the subject list,
+-- which a btree cannot serve; trigram GIN indexes can.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Keyset pagination order (also required for REFRESH MATERIALIZED VIEW CONCURRENTLY)
+CREATE UNIQUE INDEX IF NOT EXISTS faculties_mv_faculty_id_year_idx
+    ON faculties_materialized_view (faculty_id, year);
+
+CREATE INDEX IF NOT EXISTS faculties_mv_university_name_trgm_idx
+    ON faculties_materialized_view USING gin (LOWER(university_name) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS faculties_mv_faculty_name_trgm_idx
+    ON faculties_materialized_view USING gin (LOWER(faculty_name) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS faculties_mv_university_id_trgm_idx
+    ON faculties_materialized_view USING gin (university_id gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS faculties_mv_faculty_id_trgm_idx
+    ON faculties_materialized_view USING gin (faculty_id gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS faculties_mv_subjects_trgm_idx
+    ON faculties_materialized_view USING gin (subjects gin_trgm_ops);
+
+ANALYZE faculties_materialized_view;
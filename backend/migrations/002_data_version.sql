@@ -0,0 +1,25 @@
+-- Single-row data version stamp. API processes poll it and drop their in-memory caches
+-- (reference data, faculty catalog, HTTP responses) when it changes.
+
+CREATE TABLE IF NOT EXISTS data_version (
+    id         INT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version    BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+INSERT INTO data_version (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_data_version() RETURNS event_trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE data_version SET version = version + 1, updated_at = now() WHERE id = 1;
+END;
+$$;
+
+-- Bump the version whenever a materialized view (faculties_materialized_view) is refreshed.
+-- Event triggers require superuser; without one, bump the version from the data loading job instead.
+DROP EVENT TRIGGER IF EXISTS bump_data_version_on_refresh;
+CREATE EVENT TRIGGER bump_data_version_on_refresh
+    ON ddl_command_end
+    WHEN TAG IN ('REFRESH MATERIALIZED VIEW')
+    EXECUTE FUNCTION bump_data_version();
@@ -0,0 +1,82 @@
+-- Per (faculty_id, year, subject) contest score aggregates, maintained incrementally.
+-- Triggers on enrollment/result mark touched (faculty_id, year) partitions in enrollment_stats_dirty;
+-- `python -m backend.scripts.refresh_enrollment_stats` recomputes only those partitions.
+
+CREATE TABLE IF NOT EXISTS enrollment_stats (
+    faculty_id     TEXT NOT NULL,
+    year           INT NOT NULL,
+    subject_name   TEXT NOT NULL,
+    total_enrolled INT NOT NULL,
+    min_score      DOUBLE PRECISION,
+    max_score      DOUBLE PRECISION,
+    quantiles      DOUBLE PRECISION[] NOT NULL,  -- contest score at every percentile, 0..100
+    refreshed_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (faculty_id, year, subject_name)
+);
+
+CREATE TABLE IF NOT EXISTS enrollment_stats_dirty (
+    faculty_id TEXT NOT NULL,
+    year       INT NOT NULL,
+    PRIMARY KEY (faculty_id, year)
+);
+
+CREATE OR REPLACE FUNCTION mark_enrollment_stats_dirty_from_enrollment() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO enrollment_stats_dirty (faculty_id, year)
+        SELECT DISTINCT faculty_id, year FROM new_rows
+        ON CONFLICT DO NOTHING;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO enrollment_stats_dirty (faculty_id, year)
+        SELECT DISTINCT faculty_id, year FROM old_rows
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION mark_enrollment_stats_dirty_from_result() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO enrollment_stats_dirty (faculty_id, year)
+        SELECT DISTINCT e.faculty_id, e.year FROM new_rows n JOIN enrollment e ON e.student_id = n.enrollment_id
+        ON CONFLICT DO NOTHING;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO enrollment_stats_dirty (faculty_id, year)
+        SELECT DISTINCT e.faculty_id, e.year FROM old_rows o JOIN enrollment e ON e.student_id = o.enrollment_id
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+-- Statement-level triggers with transition tables keep bulk loads cheap (one INSERT per statement, not per row).
+-- Transition tables allow a single event per trigger, hence three triggers per table.
+DROP TRIGGER IF EXISTS enrollment_stats_dirty_ins ON enrollment;
+DROP TRIGGER IF EXISTS enrollment_stats_dirty_upd ON enrollment;
+DROP TRIGGER IF EXISTS enrollment_stats_dirty_del ON enrollment;
+CREATE TRIGGER enrollment_stats_dirty_ins AFTER INSERT ON enrollment
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION mark_enrollment_stats_dirty_from_enrollment();
+CREATE TRIGGER enrollment_stats_dirty_upd AFTER UPDATE ON enrollment
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION mark_enrollment_stats_dirty_from_enrollment();
+CREATE TRIGGER enrollment_stats_dirty_del AFTER DELETE ON enrollment
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION mark_enrollment_stats_dirty_from_enrollment();
+
+DROP TRIGGER IF EXISTS enrollment_stats_dirty_ins ON result;
+DROP TRIGGER IF EXISTS enrollment_stats_dirty_upd ON result;
+DROP TRIGGER IF EXISTS enrollment_stats_dirty_del ON result;
+CREATE TRIGGER enrollment_stats_dirty_ins AFTER INSERT ON result
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION mark_enrollment_stats_dirty_from_result();
+CREATE TRIGGER enrollment_stats_dirty_upd AFTER UPDATE ON result
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION mark_enrollment_stats_dirty_from_result();
+CREATE TRIGGER enrollment_stats_dirty_del AFTER DELETE ON result
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION mark_enrollment_stats_dirty_from_result();
+
+-- Everything already loaded counts as changed until the first refresh
+INSERT INTO enrollment_stats_dirty (faculty_id, year)
+SELECT DISTINCT faculty_id, year FROM enrollment
+ON CONFLICT DO NOTHING;
@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Literal, Optional
 from pydantic import BaseModel, Field, model_validator
 
 from backend import constants
@@ -9,9 +9,8 @@ class FacultyInput(BaseModel):
     year: int
 
 
-class AnalyzeRequest(BaseModel):
+class PointsRequest(BaseModel):
     points: Dict[str, float] = Field(..., description="Raw exam points by subject")
-    faculties: Optional[List[FacultyInput]] = Field(default_factory=list)
 
     @model_validator(mode="after")
     def validate_subject_combination(self):
@@ -21,6 +20,16 @@ class AnalyzeRequest(BaseModel):
         return self
 
 
+class AnalyzeRequest(PointsRequest):
+    faculties: Optional[List[FacultyInput]] = Field(default_factory=list)
+
+
+class BestFacultiesRequest(PointsRequest):
+    year: Optional[int] = Field(None, description="Admission year to rank against, latest available by default")
+    limit: int = Field(20, ge=1, le=200)
+    sort_by: Literal["margin", "rank"] = Field("margin", description="Margin above the lowest admitted score, or projected rank")
+
+
 class SubjectGrant(BaseModel):
     subject: str
     grant_score: float
@@ -36,7 +45,7 @@ class EnrollmentResult(BaseModel):
     faculty_id: str
     year: int
     contest_score: float
-    thresholds: Dict[str, float]
+    thresholds: Dict[str, Optional[float]]  # min/max_score are null when nobody was enrolled
     rank: int
     total_enrolled: int
     total_available: int
@@ -48,6 +57,79 @@ class AnalyzeResponse(BaseModel):
     enrollments: List[EnrollmentResult]
 
 
+class AdmissionChance(BaseModel):
+    faculty_id: str
+    year: int
+    contest_score: float
+    percentile: Optional[float] = Field(None, description="Share of admitted students with a lower contest score (0-100)")
+    distance_to_min: Optional[float] = Field(None, description="Contest score minus the lowest admitted score")
+    admission_probability: Optional[float] = Field(None, description="Heuristic estimate averaged over all years (0-1)")
+    years_considered: int
+
+
+class AdmissionChancesResponse(BaseModel):
+    chances: List[AdmissionChance]
+
+
+class BestFaculty(BaseModel):
+    faculty_id: str
+    year: int
+    contest_score: float
+    min_score: Optional[float]
+    margin: Optional[float] = Field(None, description="Contest score minus the lowest admitted score")
+    percentile: Optional[float]
+    projected_rank: Optional[int]
+    total_enrolled: int
+
+
+class BestFacultiesResponse(BaseModel):
+    year: int
+    faculties: List[BestFaculty]
+
+
+class WhatIfRequest(PointsRequest):
+    subjects: List[str] = Field(..., min_length=1, description="Subjects to sweep, one at a time, others fixed")
+    faculty_ids: List[str] = Field(default_factory=list, max_length=20, description="Faculties to track rank for")
+    year: Optional[int] = Field(None, description="Admission year to compare against, latest available by default")
+    step: float = Field(1, ge=0.5, description="Sweep step in raw exam points (at least 0.5)")
+
+    @model_validator(mode="after")
+    def validate_sweep_subjects(self):
+        if not set(self.subjects) <= set(self.points):
+            raise ValueError("Swept subjects must be among the given points")
+        return self
+
+
+class SweepPoint(BaseModel):
+    points: float
+    grants: Dict[str, int]
+    ranks: Dict[str, int]
+
+
+class GrantThresholdSolution(BaseModel):
+    grant_subject: str
+    grant_amount: int
+    min_points: Optional[float] = Field(None, description="Fewest raw points needed, None if unreachable")
+
+
+class AdmissionThresholdSolution(BaseModel):
+    faculty_id: str
+    min_score: Optional[float]
+    min_points: Optional[float] = Field(None, description="Fewest raw points to reach the lowest admitted score")
+
+
+class SubjectSweep(BaseModel):
+    subject: str
+    curve: List[SweepPoint]
+    grant_thresholds: List[GrantThresholdSolution]
+    admission_thresholds: List[AdmissionThresholdSolution]
+
+
+class WhatIfResponse(BaseModel):
+    year: int
+    sweeps: List[SubjectSweep]
+
+
 class FacultyData:
     def __init__(self, faculty_id: str, year: int):
         self.faculty_id = faculty_id
@@ -10,6 +10,14 @@ class FacultyQueryFilters(BaseModel):
         default=None,
         description="Year can be 2021–2024"
     )
+    cursor: Optional[str] = Field(
+        default=None,
+        description="Opaque keyset cursor from a previous response's next_cursor; takes precedence over page"
+    )
+    total_mode: Literal["exact", "estimate", "none"] = Field(
+        default="exact",
+        description="How to compute total: exact count, planner estimate, or skip it"
+    )
 
 
 class FacultyItem(BaseModel):
@@ -26,5 +34,7 @@ class FacultyItem(BaseModel):
 
 class PaginatedFacultyResponse(BaseModel):
     items: List[FacultyItem]
-    total: int
+    total: Optional[int]
     limit: int
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
@@ -0,0 +1,13 @@
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+
+
+class YearlyGrantThreshold(BaseModel):
+    year: int
+    min_grant_50: Optional[float] = Field(None, description="Lowest grant score awarded a 50% grant")
+    min_grant_70: Optional[float] = Field(None, description="Lowest grant score awarded a 70% grant")
+    min_grant_100: Optional[float] = Field(None, description="Lowest grant score awarded a 100% grant")
+
+
+class GrantThresholdsResponse(BaseModel):
+    thresholds: Dict[str, List[YearlyGrantThreshold]]
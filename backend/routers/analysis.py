@@ -1,37 +1,244 @@
-from fastapi import APIRouter, HTTPException, Depends
+import json
+from typing import AsyncIterator, Dict, List, Tuple
+
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend import db
+from backend import db, config
 
 from backend.models import analysis as analysis_models
 from backend.services import analysis as analysis_service
+from backend.services import what_if as what_if_service
+from backend.toolkit import admission, serialization
+from backend.toolkit.data_version import data_version
+from backend.toolkit.response_cache import CachedResponse, ResponseCache
+from backend.toolkit.single_flight import SingleFlight
 
 
 router = APIRouter()
 
+result_cache = ResponseCache(
+    max_entries=config.ANALYSIS_CACHE_MAX_ENTRIES,
+    max_bytes=config.ANALYSIS_CACHE_MAX_BYTES,
+    ttl=config.ANALYSIS_CACHE_TTL
+)
+analysis_flight = SingleFlight("analysis")
+
+
+def analysis_cache_key(data: analysis_models.AnalyzeRequest) -> str:
+    """
+    Canonical key for an analysis: points sorted by subject, faculties in request order (the response lists
+    enrollments in that order), plus the data version. Points are keyed exactly as given: rounding could merge
+    inputs whose scaled scores fall on different sides of a threshold.
+    """
+    points = sorted(data.points.items())
+    faculties = [(faculty.faculty_id, faculty.year) for faculty in data.faculties]
+    return ResponseCache.make_key(data_version.version, points, faculties)
+
+
 @router.post(
     "",
     response_model=analysis_models.AnalyzeResponse,
     summary="Analyze grant and enrollment eligibility based on exam scores"
 )
-async def analyze(
+async def analyze(data: analysis_models.AnalyzeRequest):
+    # No injected session: cache hits need no connection, and a computation opens its own
+    cache_key = analysis_cache_key(data)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached.body, media_type="application/json")
+
+    try:
+        if config.SINGLE_FLIGHT_ENABLED:
+            # Identical concurrent analyses (same key) share one computation on its own session
+            cached = await analysis_flight.do(cache_key, lambda: compute_analysis(data, cache_key))
+        else:
+            cached = await compute_analysis(data, cache_key)
+        return Response(content=cached.body, media_type="application/json")
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error during analysis: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+async def compute_analysis(data: analysis_models.AnalyzeRequest, cache_key: str, session: AsyncSession = None):
+    """
+    Run an analysis and memoize the encoded response. Without a session, takes a heavy admission slot and
+    opens its own read session; cache hits never get here, so they are not queued behind full analyses.
+    """
+    if session is None:
+        try:
+            async with admission.admitted(admission.HEAVY), db.read_db() as own_session:
+                return await compute_analysis(data, cache_key, own_session)
+        except admission.Shed:
+            raise db.pool_exhausted()
+
+    scaled_points = await analysis_service.calculate_scaled_points(data.points, session)
+
+    # With FAST_JSON_RESPONSES the services return lean rows that are encoded directly
+    lean = config.FAST_JSON_RESPONSES
+    grants = await analysis_service.check_grant_status(scaled_points, session, lean=lean)
+    enrollments = await analysis_service.check_enrollment_status_concurrent(
+        scaled_points,
+        data.faculties,
+        session_factory=db.read_session,
+        max_concurrency=config.ANALYSIS_MAX_CONCURRENCY,
+        min_chunk_size=config.ANALYSIS_MIN_CHUNK_SIZE,
+        lean=lean
+    )
+
+    if lean:
+        body = serialization.encode_analyze_response(grants, enrollments)
+    else:
+        body = analysis_models.AnalyzeResponse(
+            grants=grants,
+            enrollments=enrollments
+        ).model_dump_json().encode()
+    if db.replicas_may_lag():
+        return CachedResponse(body, "", None)
+    return result_cache.put(cache_key, body)
+
+
+@router.post(
+    "/chances",
+    response_model=analysis_models.AdmissionChancesResponse,
+    summary="Percentile, distance to the last admitted score and estimated admission chance per faculty"
+)
+async def admission_chances(
         data: analysis_models.AnalyzeRequest,
-        session: AsyncSession = Depends(db.get_db)
+        session: AsyncSession = Depends(db.get_read_db)
 ):
     try:
         scaled_points = await analysis_service.calculate_scaled_points(data.points, session)
+        chances = await analysis_service.estimate_admission_chances(scaled_points, data.faculties, session)
+        return analysis_models.AdmissionChancesResponse(chances=chances)
+    except Exception as e:
+        print(f"Error during admission chance estimation: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
 
-        grants = await analysis_service.check_grant_status(scaled_points, session)
-        enrollments = [
-            await analysis_service.check_enrollment_status(scaled_points, faculty, session)
-            for faculty in data.faculties
-        ]
 
-        return analysis_models.AnalyzeResponse(
-            grants=grants,
-            enrollments=enrollments
+@router.post(
+    "/best-faculties",
+    response_model=analysis_models.BestFacultiesResponse,
+    summary="Rank all faculties accepting the student's subjects by margin above the cutoff or projected rank"
+)
+async def best_faculties(
+        data: analysis_models.BestFacultiesRequest,
+        session: AsyncSession = Depends(db.get_read_db)
+):
+    try:
+        scaled_points = await analysis_service.calculate_scaled_points(data.points, session)
+        year, faculties = await analysis_service.rank_best_faculties(
+            scaled_points, data.year, data.limit, data.sort_by, session
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"Error during analysis: {e}")
+        print(f"Error during faculty ranking: {e}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    return analysis_models.BestFacultiesResponse(year=year, faculties=faculties)
+
+
+@router.post(
+    "/what-if",
+    response_model=analysis_models.WhatIfResponse,
+    summary="Sweep one subject's points to see grant and rank changes, with the exact points needed per threshold"
+)
+async def what_if(
+        data: analysis_models.WhatIfRequest,
+        session: AsyncSession = Depends(db.get_read_db)
+):
+    try:
+        return await what_if_service.what_if(data, session)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error during what-if analysis: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
+
+# Streams its body while the request body is still being read, so unlike StreamingResponse it must not
+# consume `receive` to listen for a disconnect; a gone client surfaces as an error on send instead
+class BatchResponse(StreamingResponse):
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+
+@router.post(
+    "/batch",
+    response_class=StreamingResponse,
+    summary="Analyze many students at once, streaming one AnalyzeResponse per line (NDJSON)",
+    openapi_extra={"requestBody": {"required": True, "content": {"application/json": {"schema": {
+        "type": "array", "items": {"$ref": "#/components/schemas/AnalyzeRequest"}
+    }}}}}
+)
+async def analyze_batch(request: Request):
+    """
+    Takes a JSON array of AnalyzeRequest objects. The array is parsed as it arrives and analyzed in chunks,
+    so memory use doesn't grow with the batch size; results are streamed in request order.
+    Entries that are invalid or fail are emitted as `{"index": ..., "error": ...}` lines instead of failing
+    the whole batch. A malformed body or more than ANALYSIS_BATCH_MAX_ITEMS entries ends the stream with an
+    error line at the index where it happened.
+    """
+    return BatchResponse(stream_batch_analysis(request.stream()), media_type="application/x-ndjson")
+
+
+async def stream_batch_analysis(body: AsyncIterator[bytes]):
+    chunk: List[Tuple[int, analysis_models.AnalyzeRequest | Exception]] = []
+    index = 0
+    try:
+        async for item in serialization.iter_json_array(body):
+            if index == config.ANALYSIS_BATCH_MAX_ITEMS:
+                raise serialization.JSONStreamError(
+                    f"Batch size exceeds the limit of {config.ANALYSIS_BATCH_MAX_ITEMS} students."
+                )
+            try:
+                chunk.append((index, analysis_models.AnalyzeRequest.model_validate(item)))
+            except ValidationError as e:
+                chunk.append((index, e))
+            index += 1
+            if len(chunk) == config.ANALYSIS_BATCH_CHUNK_SIZE:
+                for line in await analyze_chunk(chunk):
+                    yield line
+                chunk = []
+    except serialization.JSONStreamError as e:
+        for line in await analyze_chunk(chunk):
+            yield line
+        yield json.dumps({"index": index, "error": str(e)}) + "\n"
+        return
+
+    for line in await analyze_chunk(chunk):
+        yield line
+
+
+async def analyze_chunk(chunk: List[Tuple[int, analysis_models.AnalyzeRequest | Exception]]) -> List[str]:
+    """
+    NDJSON lines for one chunk in request order. If the chunk fails as a whole, every entry gets an error line.
+    The response outlives request dependencies, so each chunk opens its own session; no connection is held
+    while the body is read or the client reads results.
+    """
+    requests = [(index, entry) for index, entry in chunk if not isinstance(entry, Exception)]
+    results: Dict[int, analysis_models.AnalyzeResponse | Exception] = {
+        index: entry for index, entry in chunk if isinstance(entry, Exception)
+    }
+    if requests:
+        try:
+            async with db.read_session() as session:
+                responses = await analysis_service.analyze_batch([request for _, request in requests], session)
+            results.update(zip((index for index, _ in requests), responses))
+        except Exception as e:
+            print(f"Error during batch analysis: {e}")
+            results.update((index, RuntimeError("Internal Server Error")) for index, _ in requests)
+
+    lines = []
+    for index, _ in chunk:
+        result = results[index]
+        if isinstance(result, Exception):
+            lines.append(json.dumps({"index": index, "error": str(result)}) + "\n")
+        else:
+            lines.append(result.model_dump_json() + "\n")
+    return lines
@@ -1,13 +1,23 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend import db, config
 
 from backend.services import faculties as faculties_service
 from backend.models import faculties as faculties_models
+from backend.toolkit import serialization
+from backend.toolkit.faculty_catalog import faculty_catalog
+from backend.toolkit.data_version import data_version
+from backend.toolkit.response_cache import CachedResponse, ResponseCache, etag_matches
+from backend.toolkit.single_flight import SingleFlight
 
 router = APIRouter()
 
+response_cache = ResponseCache(max_entries=config.FACULTIES_CACHE_MAX_ENTRIES)
+search_flight = SingleFlight("faculties")
+
 
 @router.get(
     "",
@@ -15,9 +25,9 @@ router = APIRouter()
     summary="Search for Faculties with Pagination"
 )
 async def get_faculties(
+    request: Request,
     filters: faculties_models.FacultyQueryFilters = Depends(),
-    subjects: str = Query(..., description="Comma-separated subject list (e.g. MATH,PHYSICS)"),
-    session: AsyncSession = Depends(db.get_db)
+    subjects: str = Query(..., description="Comma-separated subject list (e.g. MATH,PHYSICS)")
 ):
     """
     Search for faculties based on various filter criteria.
@@ -25,6 +35,10 @@ async def get_faculties(
     - **subjects**: Must provide at least one subject.
     - **university name/id, faculty name/id, year**: Optional filters.
     - **page**: Page number for pagination.
+    - **cursor**: Keyset cursor from a previous `next_cursor`; cheaper than `page` for deep pages.
+    - **total_mode**: `exact`, `estimate` (planner estimate) or `none`.
+
+    Responses carry an ETag tied to the current data version; `If-None-Match` returns 304.
     """
 
     # Manually parse subjects from the query string
@@ -35,15 +49,75 @@ async def get_faculties(
             detail="Subjects must be provided as a comma-separated list with at least one subject."
         )
 
-    # Delegate calculation to service layer
-    items, total = await faculties_service.search_faculties(
-        session=session,
-        subjects=subjects,
-        filters=filters
-    )
+    cache_key = ResponseCache.make_key(data_version.version, sorted(subjects), filters.model_dump())
+    etag = ResponseCache.make_etag(cache_key, data_version.version)
+    cache_headers = {"ETag": etag, "Cache-Control": f"public, max-age={config.FACULTIES_CACHE_MAX_AGE}"}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers)
+
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached.body, media_type="application/json", headers=cache_headers)
+
+    try:
+        if config.SINGLE_FLIGHT_ENABLED:
+            # Identical concurrent searches (same key) share one computation on its own session
+            cached = await search_flight.do(cache_key, lambda: compute_page(subjects, filters, cache_key, etag))
+        else:
+            cached = await compute_page(subjects, filters, cache_key, etag)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not cached.etag:
+        cache_headers = {"Cache-Control": "no-store"}
+    return Response(content=cached.body, media_type="application/json", headers=cache_headers)
+
+
+async def compute_page(
+        subjects: List[str],
+        filters: faculties_models.FacultyQueryFilters,
+        cache_key: str,
+        etag: str,
+        session: AsyncSession = None
+):
+    """
+    Search one page and cache the encoded response. Without a session, opens one only if the search has
+    to go to the database, so catalog and cache hits never hold a connection.
+    """
+    # Served from the in-memory catalog when it is loaded, otherwise delegated to the service layer.
+    # With FAST_JSON_RESPONSES, both return lean rows that are encoded directly, skipping the models.
+    lean = config.FAST_JSON_RESPONSES
+    if config.FACULTY_CATALOG_ENABLED and faculty_catalog.loaded:
+        items, total, next_cursor = faculty_catalog.search(subjects=subjects, filters=filters, lean=lean)
+        total_is_estimate = False  # Exact totals are free in memory
+    elif session is None:
+        async with db.read_db() as own_session:
+            return await compute_page(subjects, filters, cache_key, etag, own_session)
+    else:
+        items, total, next_cursor = await faculties_service.search_faculties(
+            session=session,
+            subjects=subjects,
+            filters=filters,
+            lean=lean
+        )
+        total_is_estimate = filters.total_mode == "estimate"
+        if db.replicas_may_lag():
+            # Possibly read from a replica that hasn't caught up with the new data version: no ETag, no caching
+            return CachedResponse(encode_page(items, total, next_cursor, total_is_estimate, filters), "", None)
+
+    return response_cache.put(cache_key, encode_page(items, total, next_cursor, total_is_estimate, filters), etag)
+
 
+def encode_page(items, total: Optional[int], next_cursor: Optional[str], total_is_estimate: bool,
+                filters: faculties_models.FacultyQueryFilters) -> bytes:
+    total = None if filters.total_mode == "none" else total
+    if config.FAST_JSON_RESPONSES:
+        return serialization.encode_faculty_page(items, total, config.LIMIT_PER_PAGE, next_cursor, total_is_estimate)
     return faculties_models.PaginatedFacultyResponse(
         items=items,
         total=total,
         limit=config.LIMIT_PER_PAGE,
-    )
\ No newline at end of file
+        next_cursor=next_cursor,
+        total_is_estimate=total_is_estimate,
+    ).model_dump_json().encode()
@@ -0,0 +1,39 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+
+from backend import db, config, constants
+
+from backend.models import grants as grants_models
+from backend.toolkit.data_version import data_version
+from backend.toolkit.grant_index import grant_index
+from backend.toolkit.response_cache import ResponseCache, etag_matches
+
+router = APIRouter()
+
+
+@router.get(
+    "/thresholds",
+    response_model=grants_models.GrantThresholdsResponse,
+    summary="Lowest grant score awarded a 50%, 70% and 100% grant, per subject and year"
+)
+async def get_grant_thresholds(
+        request: Request,
+        subject: Optional[str] = Query(None, description="Limit to one subject (e.g. MATHEMATICS)")
+):
+    """
+    Served from cutoffs precomputed whenever grant data is loaded; responses carry an ETag tied to the
+    current data version, and `If-None-Match` returns 304.
+    """
+    if subject is not None and subject not in constants.SUBJECT_POINTS:
+        raise HTTPException(status_code=400, detail=f"Unknown subject {subject}.")
+
+    etag = ResponseCache.make_etag(ResponseCache.make_key("grant_thresholds", subject), data_version.version)
+    cache_headers = {"ETag": etag, "Cache-Control": f"public, max-age={config.FACULTIES_CACHE_MAX_AGE}"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers)
+
+    if not grant_index.loaded:
+        async with db.read_db() as session:
+            await grant_index.ensure_loaded(session)
+    return Response(content=grant_index.thresholds_body(subject), media_type="application/json", headers=cache_headers)
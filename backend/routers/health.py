@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from backend.toolkit.warmup import readiness
+
+router = APIRouter()
+
+
+@router.get(
+    "/ready",
+    summary="Readiness probe: 200 once startup warm-up (pool connections, reference data, catalog) has completed"
+)
+async def get_ready():
+    return JSONResponse(readiness.report(), status_code=200 if readiness.ready else 503)
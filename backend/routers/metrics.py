@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from backend import db
+from backend.toolkit import metrics
+
+router = APIRouter()
+
+
+@router.get(
+    "",
+    response_class=PlainTextResponse,
+    summary="Prometheus metrics: request timings, query counts, pool saturation and cache statistics"
+)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(db.engines()), media_type="text/plain; version=0.0.4")
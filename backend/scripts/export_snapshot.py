@@ -0,0 +1,42 @@
+"""
+Export exam, grant, faculty, faculty_year_subjects, enrollment_stats and sorted contest scores into a memory-mappable
+snapshot file for DB-free analysis workers.
+
+Usage:
+    python -m backend.scripts.export_snapshot /data/naec.snapshot
+
+Then start the API with SNAPSHOT_PATH=/data/naec.snapshot.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from backend.db import engine, AsyncSessionLocal
+from backend.toolkit.snapshot import export_snapshot, Snapshot
+
+
+async def main(path: str) -> None:
+    started = time.perf_counter()
+    tmp_path = f"{path}.tmp"
+    try:
+        async with AsyncSessionLocal() as session:
+            counts = await export_snapshot(session, tmp_path)
+    finally:
+        await engine.dispose()
+
+    # Validate before replacing, so running workers never see a broken file at `path`
+    Snapshot(tmp_path)
+    os.replace(tmp_path, path)
+
+    print(f"Snapshot written to {path} in {time.perf_counter() - started:.2f}s "
+          f"({os.path.getsize(path) / 1024 / 1024:.1f} MiB).")
+    for table, count in counts.items():
+        print(f"  {table}: {count} rows")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a data snapshot for DB-free analysis workers.")
+    parser.add_argument("path", help="Output snapshot file")
+    args = parser.parse_args()
+    asyncio.run(main(args.path))
@@ -0,0 +1,68 @@
+"""
+Load a new admission year from CSV exports with COPY.
+
+The directory holds any of exam.csv, grant.csv, faculty.csv, faculty_year_subjects.csv, enrollment.csv and
+result.csv, each with a header row naming its columns (see toolkit/loader.py). Files are streamed in chunks,
+so memory use doesn't grow with file size. Subjects are checked against constants.SUBJECT_POINTS and years
+against the year being loaded, and result rows must reference an enrollment of that year; any invalid row
+aborts the whole load.
+
+After the load commits, faculties_materialized_view is refreshed concurrently (readers are not blocked),
+enrollment_stats is brought up to date and the data version is bumped so API processes reload their caches.
+
+Usage:
+    python -m backend.scripts.load_year 2025 /data/naec/2025
+    python -m backend.scripts.load_year 2025 /data/naec/2025 --replace   # re-run: delete the year's rows first
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from backend.db import engine, AsyncSessionLocal
+from backend.toolkit import loader
+from backend.toolkit.data_version import data_version
+from backend.toolkit.enrollment_stats import refresh_enrollment_stats
+
+
+async def main(year: int, directory: str, replace: bool, chunk_rows: int) -> None:
+    started = time.perf_counter()
+    try:
+        async with engine.begin() as connection:
+            deleted, loads = await loader.load_year(connection, directory, year, replace=replace, chunk_rows=chunk_rows)
+        for table, rows in deleted.items():
+            print(f"  {table}: deleted {rows} rows of {year}")
+        for load in loads:
+            print(f"  {load.table}: {load.rows} rows in {load.seconds:.2f}s ({load.rows_per_second:,.0f} rows/s)")
+        load_seconds = time.perf_counter() - started
+        print(f"Loaded {loader.summary(loads, load_seconds)}.")
+
+        refresh_started = time.perf_counter()
+        async with engine.begin() as connection:
+            # Needs the unique (faculty_id, year) index from migrations/001
+            await connection.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY faculties_materialized_view"))
+        print(f"Refreshed faculties_materialized_view in {time.perf_counter() - refresh_started:.2f}s.")
+
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                counts = await refresh_enrollment_stats(session)
+                version = await data_version.bump(session)
+        print(f"Refreshed {counts['partitions']} enrollment_stats partitions; data version is now {version}.")
+    finally:
+        await engine.dispose()
+
+    print(f"Done in {time.perf_counter() - started:.2f}s.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load an admission year from CSV files with COPY.")
+    parser.add_argument("year", type=int, help="Admission year being loaded; every row must belong to it")
+    parser.add_argument("directory", help="Directory with <table>.csv files")
+    parser.add_argument("--replace", action="store_true", help="Delete the year's existing rows first")
+    parser.add_argument("--chunk-rows", type=int, default=50_000, help="Rows per COPY chunk")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.year, args.directory, args.replace, args.chunk_rows))
+    except loader.LoadError as e:
+        raise SystemExit(f"Load aborted, nothing was written: {e}")
@@ -0,0 +1,37 @@
+"""
+Recompute the enrollment_stats aggregate for (faculty_id, year) partitions changed since the last run.
+
+Usage:
+    python -m backend.scripts.refresh_enrollment_stats          # only changed partitions
+    python -m backend.scripts.refresh_enrollment_stats --full   # rebuild everything
+"""
+import argparse
+import asyncio
+import time
+
+from backend.db import engine, AsyncSessionLocal
+from backend.toolkit.data_version import data_version
+from backend.toolkit.enrollment_stats import refresh_enrollment_stats
+
+
+async def main(full: bool) -> None:
+    started = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                counts = await refresh_enrollment_stats(session, full=full)
+                if counts["partitions"]:
+                    # Let API processes know cached enrollment data is stale
+                    await data_version.bump(session)
+    finally:
+        await engine.dispose()
+
+    print(f"Refreshed {counts['partitions']} partitions ({counts['rows']} rows) "
+          f"in {time.perf_counter() - started:.2f}s.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the enrollment_stats aggregate.")
+    parser.add_argument("--full", action="store_true", help="Recompute all partitions")
+    args = parser.parse_args()
+    asyncio.run(main(args.full))
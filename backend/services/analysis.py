@@ -1,92 +1,113 @@
-from typing import Dict
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
+import asyncio
+from typing import Any, Dict, List, Sequence, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from backend.models.analysis import EnrollmentResult, YearlyGrantResult, SubjectGrant, FacultyData
-from backend.toolkit import query_helpers
+from backend.models.analysis import (
+    AdmissionChance, AnalyzeRequest, AnalyzeResponse, BestFaculty, EnrollmentResult, YearlyGrantResult, SubjectGrant, FacultyData
+)
+from backend.toolkit import query_helpers, snapshot
+from backend.toolkit.exam_cache import exam_stats_cache
+from backend.toolkit.grant_index import grant_index
+from backend.toolkit.contest_score_index import contest_score_index, enrollment_stats
+from backend.toolkit.enrollment_stats import summarize_year
+from backend.toolkit.weight_matrix import faculty_weight_matrix
+from backend.toolkit.serialization import ENROLLMENT_RESULT_FIELDS, EnrollmentRow, GrantRow
 
 
 async def calculate_scaled_points(points: Dict[str, float], session: AsyncSession):
-    taken_subjects = tuple(points.keys())
+    # Exam statistics are served from the process-local cache; the session is only used for a cold load
+    await exam_stats_cache.ensure_loaded(session)
+    return scale_points(points)
 
-    query = text("""
-        SELECT subject_name, year, mean, standard_deviation, max_score
-        FROM exam
-        WHERE subject_name = ANY (:taken_subjects)
-        """)
-
-    result = await session.execute(query, {
-        "taken_subjects": taken_subjects
-    })
-    exam_data = result.mappings().fetchall()
 
+def scale_points(points: Dict[str, float]) -> Dict[int, Dict[str, float]]:
     scaled_scores = {}  # each_year -> {subject -> scaled_score}
-    for row in exam_data:
-        subject_name = row['subject_name']
-        year = row['year']
-        mean = row['mean']
-        stddev = row['standard_deviation']
-        max_score = row['max_score']
+    for stats in exam_stats_cache.get(points.keys()):
+        subject_name = stats.subject_name
 
         # Some year max points differ, so we take current years percentage * target year max points
-        taken_point = points[subject_name] * max_score
-        scaled = 15 * ((taken_point - mean) / stddev) + 150
-        scaled_scores.setdefault(year, {})[subject_name] = round(scaled, 2)
+        taken_point = points[subject_name] * stats.max_score
+        scaled = 15 * ((taken_point - stats.mean) / stats.standard_deviation) + 150
+        scaled_scores.setdefault(stats.year, {})[subject_name] = round(scaled, 2)
 
     return scaled_scores
 
 
-async def check_grant_status(scaled_points_by_year, session: AsyncSession):
-    results = []
-    for year, subject_scores in scaled_points_by_year.items():
-        geo = subject_scores.get("GEORGIAN LANGUAGE", 0)
-        foreign = subject_scores.get("FOREIGN LANGUAGE", 0)
-
-        grant_subjects = {
-            s: score for s, score in subject_scores.items()
-            if s not in {"GEORGIAN LANGUAGE", "FOREIGN LANGUAGE"}
-        }
-
-        all_grants = []
-        for subject, score in grant_subjects.items():
-            grant_score = round((geo + foreign + 1.5 * score) * 10, 2)
-
-            query = text("""
-                SELECT grant_amount
-                FROM "grant"
-                WHERE grant_score < :grant_score
-                  AND subject_name = :subject_name
-                  AND year = :year
-                ORDER BY grant_score DESC
-                LIMIT 1
-            """)
-
-            result = await session.execute(query, {
-                "grant_score": grant_score,
-                "subject_name": subject,
-                "year": year
-            })
-
-            grant_amount = result.scalar_one_or_none()
-            grant_amount = grant_amount if grant_amount is not None else 0 # Default to 0 if no grant
-
-            all_grants.append(
-                SubjectGrant(
-                    subject=subject,
-                    grant_score=grant_score,
-                    grant_amount=grant_amount
-
-                )
-            )
+def compute_grant_score(subject_scores: Dict[str, float], subject: str) -> float:
+    geo = subject_scores.get("GEORGIAN LANGUAGE", 0)
+    foreign = subject_scores.get("FOREIGN LANGUAGE", 0)
+    return round((geo + foreign + 1.5 * subject_scores[subject]) * 10, 2)
 
-        results.append(
+
+async def check_grant_status(scaled_points_by_year, session: AsyncSession, lean: bool = False):
+    """
+    With `lean`, returns GrantRow tuples (toolkit.serialization) instead of YearlyGrantResult models.
+    """
+    if lean:
+        results = await grant_rows_batch([scaled_points_by_year], session)
+    else:
+        results = await check_grant_status_batch([scaled_points_by_year], session)
+    return results[0]
+
+
+async def check_grant_status_batch(
+        scaled_points_list: List[Dict[int, Dict[str, float]]],
+        session: AsyncSession
+) -> List[List[YearlyGrantResult]]:
+    return [
+        [
             YearlyGrantResult(
                 year=year,
-                grants=all_grants
+                grants=[
+                    SubjectGrant(subject=subject, grant_score=grant_score, grant_amount=grant_amount)
+                    for subject, grant_score, grant_amount in subject_grants
+                ]
             )
-        )
+            for year, subject_grants in rows
+        ]
+        for rows in await grant_rows_batch(scaled_points_list, session)
+    ]
 
-    return results
+
+async def grant_rows_batch(
+        scaled_points_list: List[Dict[int, Dict[str, float]]],
+        session: AsyncSession
+) -> List[List[GrantRow]]:
+    """
+    Resolves grants for many students at once. Grant scores are grouped per (subject, year) and
+    resolved against the in-memory grant index, so no queries are issued once the index is loaded.
+    """
+    await grant_index.ensure_loaded(session)
+
+    # (subject, year) -> [(student index, grant score)]
+    pending: Dict[Tuple[str, int], List[Tuple[int, float]]] = {}
+    for i, scaled_points_by_year in enumerate(scaled_points_list):
+        for year, subject_scores in scaled_points_by_year.items():
+            for subject in subject_scores:
+                if subject in {"GEORGIAN LANGUAGE", "FOREIGN LANGUAGE"}:
+                    continue
+                grant_score = compute_grant_score(subject_scores, subject)
+                pending.setdefault((subject, year), []).append((i, grant_score))
+
+    amounts: Dict[Tuple[int, str, int], int] = {}
+    for (subject, year), entries in pending.items():
+        resolved = grant_index.lookup_many(subject, year, [score for _, score in entries])
+        for (i, _), grant_amount in zip(entries, resolved):
+            amounts[(i, subject, year)] = grant_amount
+
+    all_results = []
+    for i, scaled_points_by_year in enumerate(scaled_points_list):
+        results = []
+        for year, subject_scores in scaled_points_by_year.items():
+            all_grants = [
+                (subject, compute_grant_score(subject_scores, subject), amounts[(i, subject, year)])
+                for subject in subject_scores
+                if subject not in {"GEORGIAN LANGUAGE", "FOREIGN LANGUAGE"}
+            ]
+            results.append((year, all_grants))
+        all_results.append(results)
+
+    return all_results
 
 
 async def check_enrollment_status(
@@ -96,40 +117,310 @@ async def check_enrollment_status(
 ) -> EnrollmentResult:
     """
     Checks the enrollment status for a given faculty and student's scaled scores.
-    Now fully asynchronous, using the refactored query_helpers.
     """
-    faculty_id, year = faculty.faculty_id, faculty.year
-    scaled_scores = scaled_points_by_year[year]
-    subjects = list(scaled_scores.keys())
+    results = await check_enrollment_status_batch(scaled_points_by_year, [faculty], session)
+    return results[0]
+
 
-    weights = await query_helpers.get_faculty_subject_weights(session, faculty_id, year, subjects)
+async def get_faculties_weights_and_capacity(
+        session: AsyncSession,
+        faculty_keys: List[Tuple[str, int]],
+        subjects: List[str]
+) -> Dict[Tuple[str, int], Dict[str, Any]]:
+    if snapshot.active_snapshot is not None:
+        return snapshot.active_snapshot.faculties_weights_and_capacity(faculty_keys, subjects)
+    return await query_helpers.get_faculties_weights_and_capacity(session, faculty_keys, subjects)
 
-    if len(weights) != len(subjects):
-        raise ValueError("Mismatch between given subjects and faculty offered subjects.")
 
+async def get_enrollment_statistics(
+        session: AsyncSession,
+        faculty_keys: List[Tuple[str, int]],
+        subject_name: str
+) -> Dict[Tuple[str, int], Dict[str, Any]]:
+    if snapshot.active_snapshot is not None:
+        return snapshot.active_snapshot.enrollment_statistics(faculty_keys, subject_name)
+    return await query_helpers.get_enrollment_statistics(session, faculty_keys, subject_name)
+
+
+async def check_enrollment_status_batch(
+        scaled_points_by_year: Dict[int, Dict[str, float]],
+        faculties: List[FacultyData],
+        session: AsyncSession
+) -> List[EnrollmentResult]:
+    """
+    Checks the enrollment status for all requested faculties at once.
+    Weights and capacity are fetched in one query; enrollment counts, rank and thresholds are answered
+    from the contest score index, which loads any faculties it has not seen yet in a single query.
+    """
+    if not faculties:
+        return []
+
+    subjects = list(next(iter(scaled_points_by_year.values()), {}).keys())
     elected_subject = query_helpers.extract_elected_subject(set(subjects))
 
-    contest_score = query_helpers.compute_contest_score(scaled_scores, weights)
+    faculty_keys = list(dict.fromkeys((faculty.faculty_id, faculty.year) for faculty in faculties))
+    faculty_data = await get_faculties_weights_and_capacity(session, faculty_keys, subjects)
+    sorted_scores = await contest_score_index.get_scores(session, faculty_keys, elected_subject)
 
-    total_enrolled_rank_data = await query_helpers.get_total_enrolled_and_rank(
-        session, faculty_id, year, contest_score, elected_subject
-    )
-    total_enrolled = total_enrolled_rank_data['total_enrolled']
-    rank = total_enrolled_rank_data['rank']
+    return build_enrollment_results(scaled_points_by_year, faculties, faculty_data, sorted_scores)
+
+
+async def check_enrollment_status_concurrent(
+        scaled_points_by_year: Dict[int, Dict[str, float]],
+        faculties: List[FacultyData],
+        session_factory: async_sessionmaker,
+        max_concurrency: int,
+        min_chunk_size: int,
+        lean: bool = False
+) -> List[EnrollmentResult] | List[EnrollmentRow]:
+    """
+    Same result as check_enrollment_status_batch, but the faculty list is split into chunks whose
+    weight and contest score queries run concurrently, each on its own pooled session.
+    At most `max_concurrency` sessions are used at once, so one large request can't drain the pool.
+    With `lean`, returns EnrollmentRow tuples (toolkit.serialization) instead of models.
+    """
+    if not faculties:
+        return []
+
+    subjects = list(next(iter(scaled_points_by_year.values()), {}).keys())
+    elected_subject = query_helpers.extract_elected_subject(set(subjects))
 
-    total_available = await query_helpers.get_total_capacity(session, faculty_id, year)
+    faculty_keys = list(dict.fromkeys((faculty.faculty_id, faculty.year) for faculty in faculties))
+    chunk_size = max(min_chunk_size, -(-len(faculty_keys) // max_concurrency))
+    chunks = [faculty_keys[i:i + chunk_size] for i in range(0, len(faculty_keys), chunk_size)]
 
-    seats_with_subject = query_helpers.get_seats_with_subject(weights, total_available)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def with_session(fetch, *args):
+        async with semaphore:
+            async with session_factory() as session:
+                return await fetch(session, *args)
+
+    fetched = await asyncio.gather(*(
+        task
+        for chunk in chunks
+        for task in (
+            with_session(get_faculties_weights_and_capacity, chunk, subjects),
+            with_session(contest_score_index.get_scores, chunk, elected_subject),
+        )
+    ))
+
+    faculty_data: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    sorted_scores: Dict[Tuple[str, int], Sequence[float]] = {}
+    for chunk_data, chunk_scores in zip(fetched[::2], fetched[1::2]):
+        faculty_data.update(chunk_data)
+        sorted_scores.update(chunk_scores)
+
+    if lean:
+        return enrollment_rows(scaled_points_by_year, faculties, faculty_data, sorted_scores)
+    return build_enrollment_results(scaled_points_by_year, faculties, faculty_data, sorted_scores)
+
+
+def build_enrollment_results(
+        scaled_points_by_year: Dict[int, Dict[str, float]],
+        faculties: List[FacultyData],
+        faculty_data: Dict[Tuple[str, int], Dict[str, Any]],
+        sorted_scores: Dict[Tuple[str, int], Sequence[float]]
+) -> List[EnrollmentResult]:
+    return [
+        EnrollmentResult(**dict(zip(ENROLLMENT_RESULT_FIELDS, row)))
+        for row in enrollment_rows(scaled_points_by_year, faculties, faculty_data, sorted_scores)
+    ]
+
+
+def enrollment_rows(
+        scaled_points_by_year: Dict[int, Dict[str, float]],
+        faculties: List[FacultyData],
+        faculty_data: Dict[Tuple[str, int], Dict[str, Any]],
+        sorted_scores: Dict[Tuple[str, int], Sequence[float]]
+) -> List[EnrollmentRow]:
+    """
+    Builds enrollment results from prefetched faculty weights/capacity and sorted contest scores.
+    """
+    results = []
+    for faculty in faculties:
+        key = (faculty.faculty_id, faculty.year)
+        scaled_scores = scaled_points_by_year[faculty.year]
+        weights = faculty_data[key]["weights"]
+
+        if len(weights) != len(scaled_scores):
+            raise ValueError("Mismatch between given subjects and faculty offered subjects.")
+
+        contest_score = query_helpers.compute_contest_score(scaled_scores, weights)
+        total_available = faculty_data[key]["capacity"]
+        stats = enrollment_stats(sorted_scores[key], contest_score)
+
+        results.append((
+            faculty.faculty_id,
+            faculty.year,
+            contest_score,
+            {
+                "faculty_id": faculty.faculty_id,
+                "year": faculty.year,
+                "min_score": stats["min_score"],
+                "max_score": stats["max_score"],
+            },
+            stats["rank"],
+            stats["total_enrolled"],
+            total_available,
+            query_helpers.get_seats_with_subject(weights, total_available)
+        ))
+
+    return results
+
+
+async def analyze_batch(
+        requests: List[AnalyzeRequest],
+        session: AsyncSession
+) -> List[AnalyzeResponse | Exception]:
+    """
+    Analyzes many students at once. DB work is grouped across the whole batch: grants are resolved
+    in one pass over the grant index, and faculty weights and contest scores are fetched once per
+    subject combination for the union of requested faculties.
+    Failed analyses are returned as exceptions in place so one bad entry doesn't fail the batch.
+    """
+    scaled_list = [await calculate_scaled_points(request.points, session) for request in requests]
+    grants_list = await check_grant_status_batch(scaled_list, session)
+
+    # subject combination -> union of requested (faculty_id, year)
+    groups: Dict[frozenset, List[Tuple[str, int]]] = {}
+    for request in requests:
+        keys = groups.setdefault(frozenset(request.points.keys()), [])
+        keys.extend((faculty.faculty_id, faculty.year) for faculty in request.faculties)
+
+    prefetched = {}
+    for combination, faculty_keys in groups.items():
+        faculty_keys = list(dict.fromkeys(faculty_keys))
+        if not faculty_keys:
+            continue
+        subjects = list(combination)
+        elected_subject = query_helpers.extract_elected_subject(set(subjects))
+        faculty_data = await get_faculties_weights_and_capacity(session, faculty_keys, subjects)
+        sorted_scores = await contest_score_index.get_scores(session, faculty_keys, elected_subject)
+        prefetched[combination] = (faculty_data, sorted_scores)
+
+    responses = []
+    for request, scaled_points, grants in zip(requests, scaled_list, grants_list):
+        try:
+            enrollments = []
+            if request.faculties:
+                faculty_data, sorted_scores = prefetched[frozenset(request.points.keys())]
+                enrollments = build_enrollment_results(scaled_points, request.faculties, faculty_data, sorted_scores)
+            responses.append(AnalyzeResponse(grants=grants, enrollments=enrollments))
+        except (KeyError, ValueError) as e:
+            responses.append(e)
+
+    return responses
+
+
+async def estimate_admission_chances(
+        scaled_points_by_year: Dict[int, Dict[str, float]],
+        faculties: List[FacultyData],
+        session: AsyncSession
+) -> List[AdmissionChance]:
+    """
+    Percentile, distance to the last admitted score and an admission probability per faculty,
+    read from the precomputed enrollment_stats percentiles (one row per faculty and year, no row scans).
+    The probability averages the requested faculty's outcome over every year with data, each year
+    using that year's scaling, weights and cutoff.
+    """
+    if not faculties:
+        return []
+
+    subjects = list(next(iter(scaled_points_by_year.values()), {}).keys())
+    elected_subject = query_helpers.extract_elected_subject(set(subjects))
+
+    faculty_ids = list(dict.fromkeys(faculty.faculty_id for faculty in faculties))
+    all_keys = [(faculty_id, year) for faculty_id in faculty_ids for year in scaled_points_by_year]
+    faculty_data = await get_faculties_weights_and_capacity(session, all_keys, subjects)
+    statistics = await get_enrollment_statistics(session, all_keys, elected_subject)
+
+    # (faculty_id, year) -> {"contest_score": .., "percentile": .., ...} for every year the faculty can be scored
+    yearly: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    for key in all_keys:
+        weights = faculty_data[key]["weights"]
+        scaled_scores = scaled_points_by_year[key[1]]
+        if len(weights) != len(scaled_scores):
+            continue
+        contest_score = query_helpers.compute_contest_score(scaled_scores, weights)
+        yearly[key] = {"contest_score": contest_score, "summary": summarize_year(statistics.get(key), contest_score)}
+
+    results = []
+    for faculty in faculties:
+        key = (faculty.faculty_id, faculty.year)
+        if key not in yearly:
+            raise ValueError("Mismatch between given subjects and faculty offered subjects.")
+
+        summary = yearly[key]["summary"] or {}
+        probabilities = [
+            entry["summary"]["probability"]
+            for (faculty_id, _), entry in yearly.items()
+            if faculty_id == faculty.faculty_id and entry["summary"] is not None
+        ]
+
+        results.append(
+            AdmissionChance(
+                faculty_id=faculty.faculty_id,
+                year=faculty.year,
+                contest_score=yearly[key]["contest_score"],
+                percentile=summary.get("percentile"),
+                distance_to_min=summary.get("distance_to_min"),
+                admission_probability=round(sum(probabilities) / len(probabilities), 3) if probabilities else None,
+                years_considered=len(probabilities)
+            )
+        )
+
+    return results
+
+
+async def rank_best_faculties(
+        scaled_points_by_year: Dict[int, Dict[str, float]],
+        year: int | None,
+        limit: int,
+        sort_by: str,
+        session: AsyncSession
+) -> Tuple[int, List[BestFaculty]]:
+    """
+    Scores every faculty that accepts the student's subjects with one matrix-vector pass over the
+    in-memory weight matrix, then ranks them by margin above the lowest admitted score or by projected
+    rank (from the enrollment_stats percentiles). Returns (year, top faculties).
+    """
+    await faculty_weight_matrix.ensure_loaded(session)
+    if year is None:
+        year = max((y for y in faculty_weight_matrix.years() if y in scaled_points_by_year), default=None)
+    if year is None or year not in scaled_points_by_year:
+        raise ValueError("No exam data for the requested year.")
+
+    scaled_scores = scaled_points_by_year[year]
+    elected_subject = query_helpers.extract_elected_subject(set(scaled_scores))
+    scores = faculty_weight_matrix.contest_scores(year, scaled_scores)
+    statistics = await get_enrollment_statistics(
+        session, [(faculty_id, year) for faculty_id, _ in scores], elected_subject
+    )
+
+    ranked = []
+    for faculty_id, contest_score in scores:
+        stats = statistics.get((faculty_id, year))
+        summary = summarize_year(stats, contest_score) if stats else None
+        total_enrolled = stats["total_enrolled"] if stats else 0
+        percentile = summary["percentile"] if summary else None
+        ranked.append(
+            BestFaculty(
+                faculty_id=faculty_id,
+                year=year,
+                contest_score=contest_score,
+                min_score=round(stats["min_score"], 2) if summary else None,
+                margin=summary["distance_to_min"] if summary else None,
+                percentile=percentile,
+                projected_rank=int(total_enrolled * (100 - percentile) / 100) + 1 if summary else None,
+                total_enrolled=total_enrolled
+            )
+        )
 
-    thresholds = await query_helpers.get_enrollment_thresholds(faculty_id, year, elected_subject, session)
+    # Faculties without admission data can't be compared and go last
+    if sort_by == "rank":
+        ranked.sort(key=lambda f: (f.projected_rank is None, f.projected_rank or 0, -f.contest_score))
+    else:
+        ranked.sort(key=lambda f: (f.margin is None, -(f.margin or 0)))
 
-    return EnrollmentResult(
-        faculty_id=faculty_id,
-        year=year,
-        contest_score=contest_score,
-        thresholds=thresholds,
-        rank=rank,
-        total_enrolled=total_enrolled,
-        total_available=total_available,
-        seats_with_subject=seats_with_subject
-    )
\ No newline at end of file
+    return year, ranked[:limit]
@@ -1,18 +1,18 @@
-from typing import List, Dict, Any, Tuple
+import json
+from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
 
 from backend import config
 from backend.models import faculties as faculties_models
+from backend.toolkit.pagination import encode_cursor, decode_cursor
+from backend.toolkit.serialization import FacultyRow
+from backend.toolkit.statements import statements
 
 
-async def search_faculties(
-        session: AsyncSession,
+def build_search_conditions(
         subjects: List[str],
         filters: faculties_models.FacultyQueryFilters,
-) -> Tuple[List[faculties_models.FacultyItem], int]:
-    offset = (filters.page - 1) * config.LIMIT_PER_PAGE
-
+) -> Tuple[str, Dict[str, Any]]:
     base_conditions = "1=1"
     params: Dict[str, Any] = {}
 
@@ -30,13 +30,14 @@ async def search_faculties(
     else:
         base_conditions += " AND (required_count = total_subjects_count OR (required_count = 2 AND elective_count > 0))"
 
+    # Name patterns are lowercased to match the LOWER(...) trigram indexes (see migrations/001)
     if university:
         base_conditions += " AND (LOWER(university_name) LIKE :university_like_1 OR university_id LIKE :university_like_2)"
-        params["university_like_1"] = f"%{university}%"
+        params["university_like_1"] = f"%{university.lower()}%"
         params["university_like_2"] = f"%{university}%"
     if faculty:
         base_conditions += " AND (LOWER(faculty_name) LIKE :faculty_like_1 OR faculty_id LIKE :faculty_like_2)"
-        params["faculty_like_1"] = f"%{faculty}%"
+        params["faculty_like_1"] = f"%{faculty.lower()}%"
         params["faculty_like_2"] = f"%{faculty}%"
 
     subject_conditions = []
@@ -47,28 +48,103 @@ async def search_faculties(
     if subject_conditions:
         base_conditions += " AND (" + " AND ".join(subject_conditions) + ")"
 
+    return base_conditions, params
+
+
+def search_statement(kind: str, sql: str, params: Dict[str, Any]):
+    """
+    Registered statement for one faculty search shape. The SQL built above is fully determined by which
+    filters are present, i.e. by the parameter names, so there are only a few dozen shapes and each one
+    stays in the prepared statement cache (see toolkit.statements).
+    """
+    return statements.shape(f"faculties.{kind}[{','.join(sorted(params))}]", sql)
+
+
+async def count_faculties(session: AsyncSession, conditions: str, params: Dict[str, Any], mode: str) -> Optional[int]:
+    """
+    Total number of matching rows. "estimate" reads the planner's row estimate instead of scanning.
+    """
+    if mode == "none":
+        return None
+
+    if mode == "estimate":
+        sql = f"EXPLAIN (FORMAT JSON) SELECT 1 FROM faculties_materialized_view WHERE {conditions}"
+        result = await session.execute(search_statement("estimate", sql, params), params)
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    sql = f"SELECT COUNT(*) FROM faculties_materialized_view WHERE {conditions}"
+    result = await session.execute(search_statement("count", sql, params), params)
+    return result.scalar_one()
+
+
+async def search_faculties(
+        session: AsyncSession,
+        subjects: List[str],
+        filters: faculties_models.FacultyQueryFilters,
+        lean: bool = False
+) -> Tuple[List[faculties_models.FacultyItem] | List[FacultyRow], Optional[int], Optional[str]]:
+    """
+    Returns (items, total, next_cursor). Pages are addressed either by `page` (offset) or, preferably,
+    by `cursor`, which seeks on the (faculty_id, year) index and costs the same for every page.
+    With `lean`, items are FacultyRow tuples (toolkit.serialization) instead of models.
+    """
+    base_conditions, params = build_search_conditions(subjects, filters)
+    # An exact total rides along with the page as an uncorrelated subquery (evaluated once), like the
+    # COUNT(*) OVER() it replaces but unaffected by the cursor condition; other modes are separate queries
+    exact = filters.total_mode == "exact"
+    base_params = dict(params)
+    total_column = ""
+    if exact:
+        total_column = f", (SELECT COUNT(*) FROM faculties_materialized_view WHERE {base_conditions}) AS total_count"
+    else:
+        total = await count_faculties(session, base_conditions, base_params, filters.total_mode)
+
+    page_conditions = base_conditions
+    if filters.cursor:
+        cursor_faculty_id, cursor_year = decode_cursor(filters.cursor)
+        page_conditions += " AND (faculty_id, year) > (:cursor_faculty_id, :cursor_year)"
+        params["cursor_faculty_id"] = cursor_faculty_id
+        params["cursor_year"] = cursor_year
+        params["offset_param"] = 0
+    else:
+        params["offset_param"] = (filters.page - 1) * config.LIMIT_PER_PAGE
+
+    # One extra row tells whether there is a next page
+    params["limit_param"] = config.LIMIT_PER_PAGE + 1
+
     full_query = f"""
-        SELECT
-            *,
-            COUNT(*) OVER() AS total_count
+        SELECT *{total_column}
         FROM faculties_materialized_view
-        WHERE {base_conditions}
+        WHERE {page_conditions}
         ORDER BY faculty_id, year ASC
         LIMIT :limit_param OFFSET :offset_param
     """
 
-    params["limit_param"] = config.LIMIT_PER_PAGE
-    params["offset_param"] = offset
-
-    result = await session.execute(text(full_query), params)
+    result = await session.execute(search_statement("page_counted" if exact else "page", full_query, params), params)
     rows = result.mappings().fetchall()
+    if exact:
+        # Past the last page there is no row to carry the total
+        total = rows[0]["total_count"] if rows else await count_faculties(session, base_conditions, base_params, "exact")
 
-    total = rows[0]['total_count'] if rows else 0
+    next_cursor = None
+    if len(rows) > config.LIMIT_PER_PAGE:
+        rows = rows[:config.LIMIT_PER_PAGE]
+        next_cursor = encode_cursor(rows[-1]["faculty_id"], rows[-1]["year"])
 
     items = []
     for row in rows:
         subjects_list = row["subjects"].split(",") if row["subjects"] else []
 
+        if lean:
+            items.append((
+                row["year"], row["faculty_id"], row["faculty_name"],
+                row["university_id"], row["university_name"], subjects_list
+            ))
+            continue
+
         items.append(faculties_models.FacultyItem(
             year=row["year"],
             faculty_id=row["faculty_id"],
@@ -78,4 +154,4 @@ async def search_faculties(
             subjects=subjects_list
         ))
 
-    return items, total
\ No newline at end of file
+    return items, total, next_cursor
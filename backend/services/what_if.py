@@ -0,0 +1,174 @@
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import constants
+from backend.models.analysis import (
+    AdmissionThresholdSolution, GrantThresholdSolution, SubjectSweep, SweepPoint, WhatIfRequest, WhatIfResponse
+)
+from backend.services import analysis as analysis_service
+from backend.toolkit import query_helpers
+from backend.toolkit.contest_score_index import contest_score_index, enrollment_stats
+from backend.toolkit.exam_cache import exam_stats_cache
+from backend.toolkit.grant_index import grant_index
+
+
+COMMON_SUBJECTS = {"GEORGIAN LANGUAGE", "FOREIGN LANGUAGE"}
+MAX_SWEEP_POINTS = 200  # Curve points per swept subject
+
+
+def scale_one(raw_points: float, subject: str, year: int) -> float:
+    """
+    Scaled score of `raw_points` (on the current maximum) in `year`, same formula as scale_points.
+    """
+    stats = exam_stats_cache.get_one(subject, year)
+    taken_point = raw_points / constants.SUBJECT_POINTS[subject] * stats.max_score
+    return round(15 * ((taken_point - stats.mean) / stats.standard_deviation) + 150, 2)
+
+
+def scaled_slope(subject: str, year: int) -> float:
+    """
+    Scaled score gained per raw point; scaling is linear, so thresholds can be solved for directly.
+    """
+    stats = exam_stats_cache.get_one(subject, year)
+    return 15 * stats.max_score / (stats.standard_deviation * constants.SUBJECT_POINTS[subject])
+
+
+def solve_min_points(
+        estimate: Optional[float],
+        reached: Callable[[float], bool],
+        step: float,
+        max_points: float
+) -> Optional[float]:
+    """
+    Fewest raw points (a multiple of `step`) for which `reached` holds, starting just below the linear
+    solution `estimate` so rounding in the scoring formulas is accounted for. None if unreachable.
+    """
+    if estimate is None:
+        return 0.0 if reached(max_points) and reached(0.0) else None
+    if estimate > max_points + step:
+        return None
+
+    points = max(0.0, (math.floor(max(estimate, 0.0) / step) - 1) * step)
+    while points <= max_points + 1e-9:
+        if reached(points):
+            return round(points, 4)
+        points += step
+    return None
+
+
+def grant_levels(subject: str, year: int) -> List[Tuple[int, float]]:
+    """
+    (grant amount, lowest grant score awarded it) per amount, ascending by amount.
+    """
+    scores, amounts = grant_index.arrays(subject, year)
+    lowest: Dict[int, float] = {}
+    for score, amount in zip(scores, amounts):
+        if amount and amount not in lowest:
+            lowest[amount] = score
+    return sorted(lowest.items())
+
+
+async def what_if(data: WhatIfRequest, session: AsyncSession) -> WhatIfResponse:
+    scaled_points_by_year = await analysis_service.calculate_scaled_points(data.points, session)
+    await grant_index.ensure_loaded(session)
+
+    year = data.year if data.year is not None else max(scaled_points_by_year, default=None)
+    if year not in scaled_points_by_year:
+        raise ValueError("No exam data for the requested year.")
+    base_scores = scaled_points_by_year[year]
+
+    subjects = list(base_scores)
+    elected_subject = query_helpers.extract_elected_subject(set(subjects))
+    faculty_keys = [(faculty_id, year) for faculty_id in dict.fromkeys(data.faculty_ids)]
+    faculty_data = await analysis_service.get_faculties_weights_and_capacity(session, faculty_keys, subjects)
+    sorted_scores = await contest_score_index.get_scores(session, faculty_keys, elected_subject)
+
+    for key in faculty_keys:
+        if len(faculty_data[key]["weights"]) != len(subjects):
+            raise ValueError(f"Faculty {key[0]} does not accept the given subjects in {year}.")
+    for subject in data.subjects:
+        # scale_one and scaled_slope need the swept subject's exam statistics for the year
+        if exam_stats_cache.get_one(subject, year) is None:
+            raise ValueError(f"No exam data for {subject} in {year}.")
+
+    grant_subjects = [s for s in subjects if s not in COMMON_SUBJECTS]
+    sweeps = []
+    for subject in data.subjects:
+        max_points = constants.SUBJECT_POINTS[subject]
+        slope = scaled_slope(subject, year)
+
+        def scores_at(raw_points: float) -> Dict[str, float]:
+            return {**base_scores, subject: scale_one(raw_points, subject, year)}
+
+        # One pass over the range: scaling, grant bisection and rank bisection per value
+        sweep_points = int(max_points / data.step) + 1
+        if sweep_points > MAX_SWEEP_POINTS:
+            raise ValueError(f"Step {data.step} gives more than {MAX_SWEEP_POINTS} sweep points for {subject}.")
+        curve = []
+        for i in range(sweep_points):
+            raw_points = round(i * data.step, 4)
+            scores = scores_at(raw_points)
+            curve.append(SweepPoint(
+                points=raw_points,
+                grants={
+                    g: grant_index.lookup(g, year, analysis_service.compute_grant_score(scores, g))
+                    for g in grant_subjects
+                },
+                ranks={
+                    faculty_id: enrollment_stats(
+                        sorted_scores[(faculty_id, year)],
+                        query_helpers.compute_contest_score(scores, faculty_data[(faculty_id, year)]["weights"])
+                    )["rank"]
+                    for faculty_id, _ in faculty_keys
+                }
+            ))
+
+        grant_thresholds = []
+        zero_scores = scores_at(0)
+        for g in grant_subjects:
+            # grant_score = 10 * (georgian + foreign + 1.5 * subject)
+            coefficient = slope * (15 if subject == g else 10 if subject in COMMON_SUBJECTS else 0)
+            base_grant_score = analysis_service.compute_grant_score(zero_scores, g)
+            for amount, lowest_score in grant_levels(g, year):
+                def reached(raw_points, g=g, lowest_score=lowest_score):
+                    return analysis_service.compute_grant_score(scores_at(raw_points), g) > lowest_score
+
+                estimate = (lowest_score - base_grant_score) / coefficient if coefficient else None
+                grant_thresholds.append(GrantThresholdSolution(
+                    grant_subject=g,
+                    grant_amount=amount,
+                    min_points=solve_min_points(estimate, reached, data.step, max_points)
+                ))
+
+        admission_thresholds = []
+        for faculty_id, _ in faculty_keys:
+            weights = faculty_data[(faculty_id, year)]["weights"]
+            admitted = sorted_scores[(faculty_id, year)]
+            if not len(admitted):
+                admission_thresholds.append(AdmissionThresholdSolution(faculty_id=faculty_id, min_score=None))
+                continue
+
+            min_score = admitted[0]
+            weight = next(row["weight"] for row in weights if row["subject_name"] == subject)
+
+            def reached(raw_points, weights=weights, min_score=min_score):
+                return query_helpers.compute_contest_score(scores_at(raw_points), weights) >= min_score
+
+            base_contest_score = query_helpers.compute_contest_score(zero_scores, weights)
+            estimate = (min_score - base_contest_score) / (weight * slope) if weight else None
+            admission_thresholds.append(AdmissionThresholdSolution(
+                faculty_id=faculty_id,
+                min_score=round(min_score, 2),
+                min_points=solve_min_points(estimate, reached, data.step, max_points)
+            ))
+
+        sweeps.append(SubjectSweep(
+            subject=subject,
+            curve=curve,
+            grant_thresholds=grant_thresholds,
+            admission_thresholds=admission_thresholds
+        ))
+
+    return WhatIfResponse(year=year, sweeps=sweeps)
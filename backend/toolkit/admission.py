@@ -0,0 +1,214 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Optional
+
+from backend import config
+from backend.toolkit import metrics
+
+
+# Cheap requests are mostly served from in-memory caches and catalogs; heavy ones run full analyses
+LIGHT, HEAVY = "light", "heavy"
+CLASSES = (LIGHT, HEAVY)
+
+admission_shed = metrics.Counter(
+    "admission_shed_total", "Requests rejected with 429 because the queue was full or the queue deadline passed."
+)
+admission_wait = metrics.Histogram("admission_queue_wait_seconds", "Time admitted requests spent queued.")
+
+
+def request_class(method: str, path: str) -> Optional[str]:
+    """
+    Admission class of a request, or None for requests that don't touch the database (health, metrics, docs).
+    POST /analysis is memoized and admitted by the router instead, only on a cache miss (see `admitted`).
+    """
+    if path.rstrip("/") == "/analysis":
+        return None
+    if path.startswith("/analysis"):
+        return HEAVY if method == "POST" else None
+    if path.startswith("/faculties") or path.startswith("/grants"):
+        return LIGHT if method in ("GET", "HEAD") else None
+    return None
+
+
+class Shed(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdmissionController:
+    """
+    Admits DB-backed requests against a budget of pooled connections: a light request reserves one, a heavy
+    one `heavy_cost` (its own session plus the concurrent chunk sessions of an analysis), so admitted requests
+    never need more connections than the pool has. At most `max_heavy` heavy requests run at once, so cheap
+    requests keep part of the budget while analyses saturate theirs.
+
+    Requests over the limit wait in a queue of at most `queue_size` for up to `queue_timeout` seconds and are
+    shed otherwise. Freed slots go to queued light requests first; a light request arriving at a full queue
+    takes the place of the newest queued heavy request, which is shed instead.
+    """
+
+    def __init__(
+            self,
+            connection_budget: int,
+            heavy_cost: int,
+            max_heavy: int,
+            queue_size: int,
+            queue_timeout: float
+    ):
+        self.connection_budget = connection_budget
+        self.costs = {LIGHT: 1, HEAVY: min(heavy_cost, connection_budget)}
+        self.max_heavy = max_heavy
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_flight: Dict[str, int] = {kind: 0 for kind in CLASSES}
+        self._waiters: Dict[str, Deque["asyncio.Future[bool]"]] = {kind: deque() for kind in CLASSES}
+
+    @property
+    def queued(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    @property
+    def reserved(self) -> int:
+        return sum(self.in_flight[kind] * self.costs[kind] for kind in CLASSES)
+
+    def _has_room(self, kind: str) -> bool:
+        if self.reserved + self.costs[kind] > self.connection_budget:
+            return False
+        return kind == LIGHT or self.in_flight[HEAVY] < self.max_heavy
+
+    async def acquire(self, kind: str) -> None:
+        """
+        Take a slot for a request of `kind`, waiting in the queue if needed. Raises Shed when rejected.
+        """
+        # Queued requests of the same or a higher priority go first
+        ahead = self._waiters[LIGHT] if kind == LIGHT else self.queued
+        if not ahead and self._has_room(kind):
+            self.in_flight[kind] += 1
+            return
+
+        if self.queued >= self.queue_size:
+            if kind == LIGHT and self._waiters[HEAVY]:
+                self._waiters[HEAVY].pop().set_result(False)
+            else:
+                self._shed(kind, "queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[kind].append(waiter)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            # Client went away while queued; hand back a slot granted in the meantime
+            self._abandon(kind, waiter)
+            raise
+
+        if not waiter.done():
+            self._abandon(kind, waiter)
+            self._shed(kind, "timeout")
+        if not waiter.result():
+            self._shed(kind, "evicted")
+        admission_wait.observe(time.perf_counter() - started, kind=kind)
+
+    @asynccontextmanager
+    async def slot(self, kind: str) -> AsyncIterator[None]:
+        await self.acquire(kind)
+        try:
+            yield
+        finally:
+            self.release(kind)
+
+    def release(self, kind: str) -> None:
+        self.in_flight[kind] -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        for kind in CLASSES:
+            waiters = self._waiters[kind]
+            while waiters and self._has_room(kind):
+                self.in_flight[kind] += 1
+                waiters.popleft().set_result(True)
+
+    def _abandon(self, kind: str, waiter: "asyncio.Future[bool]") -> None:
+        if waiter in self._waiters[kind]:
+            self._waiters[kind].remove(waiter)
+        elif waiter.done() and waiter.result():
+            self.release(kind)
+
+    def _shed(self, kind: str, reason: str) -> None:
+        admission_shed.inc(kind=kind, reason=reason)
+        raise Shed(reason)
+
+    def gauges(self) -> List[str]:
+        lines = []
+        for name, help_text, value in (
+                ("admission_in_flight", "Admitted DB-backed requests in progress.", lambda kind: self.in_flight[kind]),
+                ("admission_queue_depth", "Requests waiting for admission.", lambda kind: len(self._waiters[kind])),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            lines += [f"{name}{metrics.format_labels((('kind', kind),))} {value(kind)}" for kind in CLASSES]
+        lines += metrics.gauge(
+            "admission_connections_reserved", "Pooled connections reserved by admitted requests.", self.reserved
+        )
+        return lines + admission_shed.render() + admission_wait.render()
+
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI middleware putting DB-backed requests through an AdmissionController. Shed requests get an
+    immediate 429 with Retry-After instead of waiting on the connection pool until DB_POOL_TIMEOUT.
+    """
+
+    def __init__(self, app, controller: AdmissionController, retry_after: int):
+        self.app = app
+        self.controller = controller
+        self.body = b'{"detail":"Server is busy, retry shortly."}'
+        self.headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(self.body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        kind = request_class(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if kind is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.controller.acquire(kind)
+        except Shed:
+            await send({"type": "http.response.start", "status": 429, "headers": self.headers})
+            await send({"type": "http.response.body", "body": self.body})
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(kind)
+
+
+admission_controller = AdmissionController(
+    connection_budget=config.ADMISSION_CONNECTION_BUDGET,
+    heavy_cost=config.ADMISSION_HEAVY_COST,
+    max_heavy=config.ADMISSION_MAX_HEAVY,
+    queue_size=config.ADMISSION_QUEUE_SIZE,
+    queue_timeout=config.ADMISSION_QUEUE_TIMEOUT
+)
+
+
+@asynccontextmanager
+async def admitted(kind: str) -> AsyncIterator[None]:
+    """
+    A slot on the process-wide controller for work the middleware leaves to the router. Raises Shed when
+    rejected; a no-op when admission control is disabled.
+    """
+    if not config.ADMISSION_ENABLED:
+        yield
+        return
+    async with admission_controller.slot(kind):
+        yield
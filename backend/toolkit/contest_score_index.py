@@ -0,0 +1,129 @@
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, List, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import config
+from backend.toolkit.statements import statements
+
+
+IndexKey = Tuple[str, int, str]  # (faculty_id, year, elected_subject)
+
+
+class ContestScoreIndex:
+    """
+    Lazily built LRU index of ascending contest scores per (faculty_id, year, elected_subject).
+
+    Replaces the enrollment/result join that used to run for every rank and threshold lookup:
+    once a faculty's scores are loaded, total enrolled, rank and min/max are answered by bisection.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._scores: "OrderedDict[IndexKey, List[float]]" = OrderedDict()
+        self._snapshot = None
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def invalidate(self) -> None:
+        self._scores = OrderedDict()
+
+    def use_snapshot(self, snapshot) -> None:
+        """
+        Read scores from a memory-mapped data snapshot (toolkit.snapshot) instead of the database.
+        """
+        self._snapshot = snapshot
+
+    def _get(self, key: IndexKey) -> List[float] | None:
+        scores = self._scores.get(key)
+        if scores is not None:
+            self._scores.move_to_end(key)
+        return scores
+
+    def _put(self, key: IndexKey, scores: List[float]) -> None:
+        self._scores[key] = scores
+        self._scores.move_to_end(key)
+        while len(self._scores) > self.max_entries:
+            self._scores.popitem(last=False)
+
+    async def get_scores(
+            self,
+            session: AsyncSession,
+            faculty_keys: List[Tuple[str, int]],
+            elected_subject: str
+    ) -> Dict[Tuple[str, int], Sequence[float]]:
+        """
+        Sorted contest scores for each (faculty_id, year); missing entries are loaded in a single query.
+        """
+        if self._snapshot is not None:
+            return {
+                (faculty_id, year): self._snapshot.contest_scores(faculty_id, year, elected_subject)
+                for faculty_id, year in faculty_keys
+            }
+
+        found: Dict[Tuple[str, int], List[float]] = {}
+        missing = []
+        for faculty_id, year in faculty_keys:
+            scores = self._get((faculty_id, year, elected_subject))
+            if scores is None:
+                missing.append((faculty_id, year))
+            else:
+                found[(faculty_id, year)] = scores
+
+        if missing:
+            loaded = await fetch_contest_scores(session, missing, elected_subject)
+            for key in missing:
+                scores = loaded.get(key, [])
+                self._put((key[0], key[1], elected_subject), scores)
+                found[key] = scores
+
+        return found
+
+
+CONTEST_SCORES = statements.register("contest_scores", """
+    SELECT e.faculty_id, e.year, contest_score
+    FROM unnest(CAST(:faculty_ids AS text[]), CAST(:years AS int[])) AS req(faculty_id, year)
+    JOIN enrollment e ON e.faculty_id = req.faculty_id AND e.year = req.year
+    JOIN result r ON r.enrollment_id = e.student_id
+    WHERE r.subject_name = :elected_subject
+    ORDER BY e.faculty_id, e.year, contest_score
+""")
+
+
+async def fetch_contest_scores(
+        session: AsyncSession,
+        faculty_keys: List[Tuple[str, int]],
+        elected_subject: str
+) -> Dict[Tuple[str, int], List[float]]:
+    """
+    Fetch ascending contest scores of enrolled students for many (faculty_id, year) pairs.
+    """
+    result = await session.execute(CONTEST_SCORES, {
+        "faculty_ids": [faculty_id for faculty_id, _ in faculty_keys],
+        "years": [year for _, year in faculty_keys],
+        "elected_subject": elected_subject
+    })
+
+    scores: Dict[Tuple[str, int], List[float]] = {}
+    for faculty_id, year, contest_score in result.fetchall():
+        if contest_score is not None:
+            scores.setdefault((faculty_id, year), []).append(float(contest_score))
+    return scores
+
+
+def enrollment_stats(scores: Sequence[float], score: float) -> Dict[str, Any]:
+    """
+    Total enrolled, rank (number of higher contest scores + 1) and min/max for an ascending score list.
+    """
+    total_enrolled = len(scores)
+    return {
+        "total_enrolled": total_enrolled,
+        "rank": total_enrolled - bisect_right(scores, score) + 1,
+        "min_score": round(scores[0], 2) if scores else None,
+        "max_score": round(scores[-1], 2) if scores else None,
+    }
+
+
+contest_score_index = ContestScoreIndex(max_entries=config.CONTEST_SCORE_INDEX_MAX_ENTRIES)
@@ -0,0 +1,77 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, List
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.toolkit.statements import statements
+
+
+DATA_VERSION = statements.register("data_version", "SELECT version FROM data_version WHERE id = 1")
+BUMP_DATA_VERSION = statements.register(
+    "bump_data_version", "UPDATE data_version SET version = version + 1, updated_at = now() WHERE id = 1 RETURNING version"
+)
+
+
+class DataVersion:
+    """
+    Tracks the `data_version` stamp (see migrations/002) and notifies listeners when it changes,
+    so in-memory caches can be dropped or rebuilt after new admission data is loaded.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.changed_at = 0.0  # time.monotonic() of the last change seen by check()
+        self._listeners: List[Callable[[AsyncSession], Awaitable[None]]] = []
+
+    def on_change(self, listener: Callable[[AsyncSession], Awaitable[None]]) -> None:
+        self._listeners.append(listener)
+
+    async def fetch(self, session: AsyncSession) -> int:
+        result = await session.execute(DATA_VERSION)
+        version = result.scalar_one_or_none()
+        return version if version is not None else 0
+
+    @staticmethod
+    async def bump(session: AsyncSession) -> int:
+        """
+        Advance the stamp from a data loading job so API processes reload their caches. Returns the new version.
+        """
+        result = await session.execute(BUMP_DATA_VERSION)
+        version = result.scalar_one_or_none()
+        return version if version is not None else 0
+
+    async def check(self, session_factory: async_sessionmaker) -> bool:
+        """
+        Re-read the stamp and run listeners if it moved. Returns True if the version changed.
+        """
+        async with session_factory() as session:
+            version = await self.fetch(session)
+            if version == self.version:
+                return False
+
+            print(f"Data version changed ({self.version} -> {version}), reloading caches.")
+            for listener in self._listeners:
+                try:
+                    await listener(session)
+                except Exception as e:
+                    print(f"WARNING: Cache reload after data version change failed: {e}")
+            # Only now: ETags and response cache keys built from the new version must not be paired
+            # with bodies computed from caches that were still being rebuilt
+            self.version = version
+            self.changed_at = time.monotonic()
+            return True
+
+    def changed_within(self, seconds: float) -> bool:
+        return self.changed_at > 0 and time.monotonic() - self.changed_at < seconds
+
+    async def watch(self, session_factory: async_sessionmaker, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.check(session_factory)
+            except Exception as e:
+                print(f"WARNING: Data version check failed: {e}")
+
+
+data_version = DataVersion()
@@ -0,0 +1,108 @@
+import math
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+QUANTILE_FRACTIONS = [i / 100 for i in range(101)]
+
+AGGREGATE_SELECT = """
+    SELECT
+        e.faculty_id,
+        e.year,
+        r.subject_name,
+        COUNT(*) AS total_enrolled,
+        MIN(contest_score) AS min_score,
+        MAX(contest_score) AS max_score,
+        percentile_cont(CAST(:fractions AS float8[])) WITHIN GROUP (ORDER BY contest_score) AS quantiles
+    FROM enrollment e
+    JOIN result r ON r.enrollment_id = e.student_id
+"""
+
+
+async def refresh_enrollment_stats(session: AsyncSession, full: bool = False) -> Dict[str, int]:
+    """
+    Recompute enrollment_stats (see migrations/003) for partitions marked dirty, or for everything when `full`.
+    Runs in the caller's transaction; returns the number of partitions and rows written.
+    """
+    if full:
+        await session.execute(text("TRUNCATE enrollment_stats, enrollment_stats_dirty"))
+        result = await session.execute(text(f"""
+            INSERT INTO enrollment_stats (faculty_id, year, subject_name, total_enrolled, min_score, max_score, quantiles)
+            {AGGREGATE_SELECT}
+            WHERE contest_score IS NOT NULL
+            GROUP BY e.faculty_id, e.year, r.subject_name
+        """), {"fractions": QUANTILE_FRACTIONS})
+        partitions = await session.execute(text("SELECT COUNT(DISTINCT (faculty_id, year)) FROM enrollment_stats"))
+        return {"partitions": partitions.scalar_one(), "rows": result.rowcount}
+
+    dirty = await session.execute(text("""
+        DELETE FROM enrollment_stats_dirty
+        RETURNING faculty_id, year
+    """))
+    partitions: List[Tuple[str, int]] = [tuple(row) for row in dirty.fetchall()]
+    if not partitions:
+        return {"partitions": 0, "rows": 0}
+
+    params: Dict[str, Any] = {
+        "faculty_ids": [faculty_id for faculty_id, _ in partitions],
+        "years": [year for _, year in partitions],
+        "fractions": QUANTILE_FRACTIONS,
+    }
+    await session.execute(text("""
+        DELETE FROM enrollment_stats s
+        USING unnest(CAST(:faculty_ids AS text[]), CAST(:years AS int[])) AS p(faculty_id, year)
+        WHERE s.faculty_id = p.faculty_id AND s.year = p.year
+    """), params)
+    result = await session.execute(text(f"""
+        INSERT INTO enrollment_stats (faculty_id, year, subject_name, total_enrolled, min_score, max_score, quantiles)
+        {AGGREGATE_SELECT}
+        JOIN unnest(CAST(:faculty_ids AS text[]), CAST(:years AS int[])) AS p(faculty_id, year)
+            ON e.faculty_id = p.faculty_id AND e.year = p.year
+        WHERE contest_score IS NOT NULL
+        GROUP BY e.faculty_id, e.year, r.subject_name
+    """), params)
+    return {"partitions": len(partitions), "rows": result.rowcount}
+
+
+def percentile_from_quantiles(quantiles: Sequence[float], score: float) -> float:
+    """
+    Share (0-100) of admitted students with a lower contest score, interpolated between stored percentiles.
+    """
+    if score < quantiles[0]:
+        return 0.0
+    if score >= quantiles[-1]:
+        return 100.0
+    i = bisect_right(quantiles, score) - 1
+    low, high = quantiles[i], quantiles[i + 1]
+    fraction = (score - low) / (high - low) if high > low else 0.0
+    return round((i + fraction) * 100 / (len(quantiles) - 1), 2)
+
+
+def admission_probability(margin: float, quantiles: Sequence[float]) -> float:
+    """
+    Heuristic chance of clearing a cutoff given the margin above last year's lowest admitted score.
+    The logistic curve is 0.5 at the cutoff and its width is the spread of the bottom decile of admitted
+    scores, i.e. how much the cutoff region typically moves between competitive and weak applicants.
+    """
+    scale = max(quantiles[10] - quantiles[0], 1.0) if len(quantiles) > 10 else 1.0
+    x = margin / scale
+    # Evaluated so exp() only sees non-positive arguments and cannot overflow for far-off margins
+    if x >= 0:
+        return 1 / (1 + math.exp(-x))
+    z = math.exp(x)
+    return z / (1 + z)
+
+
+def summarize_year(stats: Optional[Dict[str, Any]], contest_score: float) -> Optional[Dict[str, float]]:
+    if stats is None or stats["min_score"] is None:
+        return None
+    quantiles = stats["quantiles"]
+    margin = contest_score - stats["min_score"]
+    return {
+        "percentile": percentile_from_quantiles(quantiles, contest_score),
+        "distance_to_min": round(margin, 2),
+        "probability": admission_probability(margin, quantiles),
+    }
@@ -0,0 +1,101 @@
+import asyncio
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class ExamStats:
+    __slots__ = ("subject_name", "year", "mean", "standard_deviation", "max_score")
+
+    def __init__(self, subject_name: str, year: int, mean: float, standard_deviation: float, max_score: float):
+        self.subject_name = subject_name
+        self.year = year
+        self.mean = mean
+        self.standard_deviation = standard_deviation
+        self.max_score = max_score
+
+
+class ExamStatsCache:
+    """
+    Process-local cache of exam statistics (mean, standard deviation, max score) per subject and year.
+    Exam statistics only change when a new admission year is loaded, so the whole table is kept in memory
+    and scaling becomes pure arithmetic. Call `refresh` after loading new data, or `invalidate` to force
+    a reload on next use.
+    """
+
+    def __init__(self):
+        self._by_subject: Dict[str, List[ExamStats]] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    async def refresh(self, session: AsyncSession) -> int:
+        """
+        Reload all exam statistics from the database. Returns the number of rows loaded.
+        """
+        query = text("""
+            SELECT subject_name, year, mean, standard_deviation, max_score
+            FROM exam
+            ORDER BY subject_name, year
+        """)
+        result = await session.execute(query)
+        return self.load(result.mappings().fetchall())
+
+    def load(self, rows: Iterable[Mapping[str, Any]]) -> int:
+        """
+        Replace the cache contents with the given exam rows (from the database or a data snapshot).
+        """
+        count = 0
+        by_subject: Dict[str, List[ExamStats]] = {}
+        for row in rows:
+            count += 1
+            by_subject.setdefault(row['subject_name'], []).append(
+                ExamStats(
+                    subject_name=row['subject_name'],
+                    year=row['year'],
+                    mean=row['mean'],
+                    standard_deviation=row['standard_deviation'],
+                    max_score=row['max_score'],
+                )
+            )
+
+        # Swap in a single assignment so concurrent readers never see a half-built cache
+        self._by_subject = by_subject
+        self._loaded = True
+        return count
+
+    async def ensure_loaded(self, session: AsyncSession) -> None:
+        if self._loaded:
+            return
+        async with self._lock:
+            if not self._loaded:
+                await self.refresh(session)
+
+    def invalidate(self) -> None:
+        self._loaded = False
+
+    def get(self, subjects: Iterable[str]) -> List[ExamStats]:
+        """
+        Return exam statistics for all years of the given subjects.
+        """
+        by_subject = self._by_subject
+        stats = []
+        for subject in subjects:
+            stats.extend(by_subject.get(subject, ()))
+        return stats
+
+    def get_one(self, subject_name: str, year: int) -> Optional[ExamStats]:
+        for stats in self._by_subject.get(subject_name, ()):
+            if stats.year == year:
+                return stats
+        return None
+
+    def years(self) -> Tuple[int, ...]:
+        return tuple(sorted({s.year for rows in self._by_subject.values() for s in rows}))
+
+
+exam_stats_cache = ExamStatsCache()
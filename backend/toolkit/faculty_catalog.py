@@ -0,0 +1,237 @@
+import asyncio
+import sys
+import time
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import config
+from backend.models import faculties as faculties_models
+from backend.toolkit.pagination import encode_cursor, decode_cursor
+from backend.toolkit.serialization import FACULTY_ITEM_FIELDS, FacultyRow
+
+
+def trigrams(value: str) -> Set[str]:
+    """
+    Lowercased character trigrams of every word, padded like pg_trgm ("  w", " wo", ..., "rd ").
+    """
+    grams = set()
+    for word in value.lower().split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class CatalogEntry:
+    __slots__ = (
+        "key", "year", "faculty_id", "university_id", "faculty_name_lower", "university_name_lower",
+        "subjects", "required_count", "elective_count", "total_subjects_count", "row"
+    )
+
+    def __init__(self, row: Dict[str, Any]):
+        self.key = (row["faculty_id"], row["year"])
+        self.year = row["year"]
+        self.faculty_id = row["faculty_id"]
+        self.university_id = row["university_id"]
+        self.faculty_name_lower = (row["faculty_name"] or "").lower()
+        self.university_name_lower = (row["university_name"] or "").lower()
+        self.subjects = row["subjects"] or ""
+        self.required_count = row["required_count"]
+        self.elective_count = row["elective_count"]
+        self.total_subjects_count = row["total_subjects_count"]
+        # Lean FacultyRow (toolkit.serialization); models are only built when a caller asks for them
+        self.row = (
+            row["year"],
+            row["faculty_id"],
+            row["faculty_name"],
+            row["university_id"],
+            row["university_name"],
+            self.subjects.split(",") if self.subjects else []
+        )
+
+
+class TrigramIndex:
+    """
+    Trigram -> entry positions over one lowercased text column, for substring and typo-tolerant matching.
+
+    Two posting lists are kept: word trigrams padded like pg_trgm for similarity, and raw three-character
+    windows of the whole value for substrings, which may start or end mid-word.
+    """
+
+    def __init__(self, values: List[str]):
+        self.values = values
+        self.postings: Dict[str, List[int]] = {}
+        self.windows: Dict[str, List[int]] = {}
+        for position, value in enumerate(values):
+            for gram in trigrams(value):
+                self.postings.setdefault(gram, []).append(position)
+            for window in {value[i:i + 3] for i in range(len(value) - 2)}:
+                self.windows.setdefault(window, []).append(position)
+
+    def contains(self, query: str) -> Set[int]:
+        """
+        Positions whose value contains `query`: candidates are the intersection of the postings of the
+        query's windows, verified with a substring check. Queries under three characters are scanned.
+        """
+        windows = {query[i:i + 3] for i in range(len(query) - 2)}
+        if not windows:
+            return {position for position, value in enumerate(self.values) if query in value}
+
+        postings = sorted((self.windows.get(window, ()) for window in windows), key=len)
+        candidates = set(postings[0])
+        for positions in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(positions)
+        return {position for position in candidates if query in self.values[position]}
+
+    def match(self, query: str, fuzzy_threshold: float) -> Set[int]:
+        """
+        Positions whose value contains `query`, or shares at least `fuzzy_threshold` of its trigrams.
+        """
+        query = query.lower()
+        matched = self.contains(query)
+
+        query_grams = trigrams(query)
+        if query_grams:
+            hits: Dict[int, int] = {}
+            for gram in query_grams:
+                for position in self.postings.get(gram, ()):
+                    hits[position] = hits.get(position, 0) + 1
+
+            required = max(1, int(len(query_grams) * fuzzy_threshold + 0.5))
+            matched.update(position for position, count in hits.items() if count >= required)
+
+        return matched
+
+
+class FacultyCatalog:
+    """
+    In-process copy of faculties_materialized_view with trigram indexes over university and faculty names.
+
+    Serves the same filters as GET /faculties (plus typo tolerance on names) without touching the database.
+    `refresh` builds a complete new snapshot and swaps it in, so it can be called on a live process.
+    """
+
+    def __init__(self, fuzzy_threshold: float):
+        self.fuzzy_threshold = fuzzy_threshold
+        self._entries: List[CatalogEntry] = []
+        self._university_index: Optional[TrigramIndex] = None
+        self._faculty_index: Optional[TrigramIndex] = None
+        self._stats: Dict[str, Any] = {"loaded": False}
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._stats["loaded"]
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._stats)
+
+    async def refresh(self, session: AsyncSession) -> Dict[str, Any]:
+        """
+        Rebuild the catalog from faculties_materialized_view. Returns build statistics.
+        """
+        async with self._lock:
+            started = time.perf_counter()
+            result = await session.execute(text("""
+                SELECT *
+                FROM faculties_materialized_view
+                ORDER BY faculty_id, year ASC
+            """))
+            entries = [CatalogEntry(row) for row in result.mappings().fetchall()]
+            # Cursors are compared with Python's (code point) ordering in `search`; the database orders by
+            # its collation, which can differ, so the order the pages are cut from is fixed here
+            entries.sort(key=lambda e: e.key)
+
+            university_index = TrigramIndex([e.university_name_lower for e in entries])
+            faculty_index = TrigramIndex([e.faculty_name_lower for e in entries])
+            build_seconds = time.perf_counter() - started
+
+            self._entries = entries
+            self._university_index = university_index
+            self._faculty_index = faculty_index
+            self._stats = {
+                "loaded": True,
+                "rows": len(entries),
+                "build_seconds": round(build_seconds, 4),
+                "memory_bytes": deep_sizeof((entries, university_index, faculty_index)),
+                "loaded_at": time.time(),
+            }
+            return self.stats()
+
+    def search(
+            self,
+            subjects: List[str],
+            filters: faculties_models.FacultyQueryFilters,
+            lean: bool = False
+    ) -> Tuple[List[faculties_models.FacultyItem] | List[FacultyRow], int, Optional[str]]:
+        """
+        Same contract as services.faculties.search_faculties: (items, total, next_cursor).
+        """
+        entries = self._entries
+        candidates: Optional[Set[int]] = None
+
+        if filters.university:
+            candidates = self._university_index.match(filters.university, self.fuzzy_threshold)
+            candidates.update(i for i, e in enumerate(entries) if filters.university in e.university_id)
+        if filters.faculty:
+            matched = self._faculty_index.match(filters.faculty, self.fuzzy_threshold)
+            matched.update(i for i, e in enumerate(entries) if filters.faculty in e.faculty_id)
+            candidates = matched if candidates is None else candidates & matched
+
+        positions = range(len(entries)) if candidates is None else sorted(candidates)
+        matches = [entries[i] for i in positions if self._matches_filters(entries[i], subjects, filters.year)]
+
+        if filters.cursor:
+            cursor_key = decode_cursor(filters.cursor)
+            offset = bisect_right([e.key for e in matches], cursor_key)
+        else:
+            offset = (filters.page - 1) * config.LIMIT_PER_PAGE
+        page = matches[offset:offset + config.LIMIT_PER_PAGE]
+
+        next_cursor = None
+        if page and offset + config.LIMIT_PER_PAGE < len(matches):
+            next_cursor = encode_cursor(*page[-1].key)
+
+        if lean:
+            return [e.row for e in page], len(matches), next_cursor
+        return [faculties_models.FacultyItem(**dict(zip(FACULTY_ITEM_FIELDS, e.row))) for e in page], len(matches), next_cursor
+
+    @staticmethod
+    def _matches_filters(entry: CatalogEntry, subjects: List[str], year: Optional[int]) -> bool:
+        if year is not None and entry.year != int(year):
+            return False
+        if len(subjects) == 2:
+            if not (entry.elective_count > 0 and entry.required_count == 3):
+                return False
+        elif not (entry.required_count == entry.total_subjects_count
+                  or (entry.required_count == 2 and entry.elective_count > 0)):
+            return False
+        return all(s in entry.subjects for s in subjects)
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    Approximate recursive memory footprint of containers, slotted objects and pydantic models.
+    """
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(deep_sizeof(getattr(obj, slot), seen) for slot in obj.__slots__ if hasattr(obj, slot))
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(obj.__dict__, seen)
+    return size
+
+
+faculty_catalog = FacultyCatalog(fuzzy_threshold=config.CATALOG_FUZZY_THRESHOLD)
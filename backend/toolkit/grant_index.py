@@ -0,0 +1,142 @@
+import asyncio
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.toolkit import serialization
+
+
+GRANT_AMOUNTS = (50, 70, 100)
+
+
+class GrantIndex:
+    """
+    In-memory index of the "grant" table, held as sorted per-(subject, year) score arrays.
+
+    Resolving a grant is equivalent to
+        SELECT grant_amount FROM "grant" WHERE grant_score < :score ... ORDER BY grant_score DESC LIMIT 1
+    and is answered with a binary search instead of a query.
+
+    The 50/70/100% cutoffs per subject and year (the lowest grant score awarded each amount) are derived
+    once per load and kept as encoded JSON, so GET /grants/thresholds is a dictionary lookup.
+    """
+
+    def __init__(self):
+        # (subject_name, year) -> (ascending grant scores, matching grant amounts)
+        self._arrays: Dict[Tuple[str, int], Tuple[Sequence[float], Sequence[int]]] = {}
+        self._threshold_bodies: Dict[Optional[str], bytes] = {None: serialization.dumps({"thresholds": {}})}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    async def refresh(self, session: AsyncSession) -> int:
+        """
+        Reload the whole grant table. Returns the number of rows loaded.
+        """
+        query = text("""
+            SELECT subject_name, year, grant_score, grant_amount
+            FROM "grant"
+            ORDER BY subject_name, year, grant_score, grant_amount
+        """)
+        result = await session.execute(query)
+        rows = result.fetchall()
+
+        arrays: Dict[Tuple[str, int], Tuple[List[float], List[int]]] = {}
+        for subject_name, year, grant_score, grant_amount in rows:
+            scores, amounts = arrays.setdefault((subject_name, year), ([], []))
+            scores.append(float(grant_score))
+            amounts.append(grant_amount)
+
+        self.load(arrays)
+        return len(rows)
+
+    def load(self, arrays: Dict[Tuple[str, int], Tuple[Sequence[float], Sequence[int]]]) -> None:
+        """
+        Replace the index with prebuilt ascending arrays, e.g. memory-mapped views from a data snapshot.
+        """
+        thresholds = build_thresholds(arrays)
+        bodies = {None: serialization.dumps({"thresholds": thresholds})}
+        for subject_name, rows in thresholds.items():
+            bodies[subject_name] = serialization.dumps({"thresholds": {subject_name: rows}})
+
+        self._arrays = arrays
+        self._threshold_bodies = bodies
+        self._loaded = True
+
+    async def ensure_loaded(self, session: AsyncSession) -> None:
+        if self._loaded:
+            return
+        async with self._lock:
+            if not self._loaded:
+                await self.refresh(session)
+
+    def invalidate(self) -> None:
+        self._loaded = False
+
+    def lookup(self, subject_name: str, year: int, grant_score: float) -> int:
+        """
+        Grant amount for a single grant score, 0 if it is below every threshold.
+        """
+        arrays = self._arrays.get((subject_name, year))
+        if arrays is None:
+            return 0
+        scores, amounts = arrays
+        idx = bisect_left(scores, grant_score) - 1
+        return amounts[idx] if idx >= 0 else 0
+
+    def lookup_many(self, subject_name: str, year: int, grant_scores: Iterable[float]) -> List[int]:
+        """
+        Grant amounts for many grant scores of the same subject and year.
+        """
+        arrays = self._arrays.get((subject_name, year))
+        if arrays is None:
+            return [0 for _ in grant_scores]
+        scores, amounts = arrays
+        resolved = []
+        for grant_score in grant_scores:
+            idx = bisect_left(scores, grant_score) - 1
+            resolved.append(amounts[idx] if idx >= 0 else 0)
+        return resolved
+
+    def thresholds_body(self, subject_name: Optional[str] = None) -> bytes:
+        """
+        Encoded GrantThresholdsResponse for all subjects, or for one (empty if it has no grant data).
+        """
+        body = self._threshold_bodies.get(subject_name)
+        if body is None:
+            body = self._threshold_bodies[None] if subject_name is None else serialization.dumps({"thresholds": {}})
+        return body
+
+    def keys(self) -> Sequence[Tuple[str, int]]:
+        return sorted(self._arrays.keys())
+
+    def arrays(self, subject_name: str, year: int) -> Tuple[Sequence[float], Sequence[int]]:
+        return self._arrays.get((subject_name, year), ([], []))
+
+
+def build_thresholds(
+        arrays: Dict[Tuple[str, int], Tuple[Sequence[float], Sequence[int]]]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    {subject: [{"year", "min_grant_50", "min_grant_70", "min_grant_100"}, ...]}, years ascending; the same
+    figures query_helpers.get_grant_thresholds aggregates from the grant table.
+    """
+    thresholds: Dict[str, List[Dict[str, Any]]] = {}
+    for subject_name, year in sorted(arrays):
+        scores, amounts = arrays[(subject_name, year)]
+        lowest: Dict[int, float] = {}
+        for grant_score, grant_amount in zip(scores, amounts):
+            if grant_amount in GRANT_AMOUNTS and grant_amount not in lowest:
+                lowest[grant_amount] = grant_score
+        row = {"year": year}
+        row.update({f"min_grant_{amount}": lowest.get(amount) for amount in GRANT_AMOUNTS})
+        thresholds.setdefault(subject_name, []).append(row)
+    return thresholds
+
+
+grant_index = GrantIndex()
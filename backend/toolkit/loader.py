@@ -0,0 +1,207 @@
+import csv
+import io
+import os
+import time
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from backend import constants
+
+
+# Load order respects result -> enrollment references; file names are "<table>.csv"
+TABLE_COLUMNS: Dict[str, List[str]] = {
+    "exam": ["subject_name", "year", "mean", "standard_deviation", "max_score"],
+    "grant": ["subject_name", "year", "grant_score", "grant_amount"],
+    "faculty": ["id", "year", "name", "university_id", "university_name", "capacity"],
+    "faculty_year_subjects": ["faculty_id", "year", "subject_name", "weight", "seats", "is_required"],
+    "enrollment": ["student_id", "faculty_id", "year", "contest_score"],
+    "result": ["enrollment_id", "subject_name"],
+}
+
+# Student ids enrolled in the loaded year; result rows have no year of their own and are checked against these
+ENROLLED_IDS = "SELECT student_id FROM enrollment WHERE year = :year"
+
+# Rows of the loaded year, removed first with `replace`; result rows have no year of their own
+DELETE_YEAR = [
+    ("result", "DELETE FROM result WHERE enrollment_id IN (SELECT student_id FROM enrollment WHERE year = :year)"),
+    ("enrollment", "DELETE FROM enrollment WHERE year = :year"),
+    ("faculty_year_subjects", "DELETE FROM faculty_year_subjects WHERE year = :year"),
+    ("faculty", "DELETE FROM faculty WHERE year = :year"),
+    ("grant", 'DELETE FROM "grant" WHERE year = :year'),
+    ("exam", "DELETE FROM exam WHERE year = :year"),
+]
+
+
+class LoadError(ValueError):
+    pass
+
+
+class TableLoad:
+    __slots__ = ("table", "path", "columns", "rows", "seconds")
+
+    def __init__(self, table: str, path: str):
+        self.table = table
+        self.path = path
+        self.columns: List[str] = []
+        self.rows = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def find_csv_files(directory: str) -> List[TableLoad]:
+    """
+    The "<table>.csv" files present in `directory`, in load order.
+    """
+    loads = [
+        TableLoad(table, os.path.join(directory, f"{table}.csv"))
+        for table in TABLE_COLUMNS
+        if os.path.exists(os.path.join(directory, f"{table}.csv"))
+    ]
+    if not loads:
+        raise LoadError(f"No CSV files for {', '.join(TABLE_COLUMNS)} found in {directory}.")
+    return loads
+
+
+def validated_rows(
+        load: TableLoad,
+        reader: Iterator[List[str]],
+        year: int,
+        enrolled_ids: Optional[Set[int]] = None
+) -> Iterator[List[str]]:
+    """
+    Yield CSV rows after checking the subject against constants.SUBJECT_POINTS, the year against `year`
+    and, for result rows, the enrollment against `enrolled_ids` (the enrollments of `year`).
+    """
+    subject_index = load.columns.index("subject_name") if "subject_name" in load.columns else None
+    year_index = load.columns.index("year") if "year" in load.columns else None
+    enrollment_index = load.columns.index("enrollment_id") if enrolled_ids is not None else None
+
+    for line_number, row in enumerate(reader, start=2):
+        if len(row) != len(load.columns):
+            raise LoadError(f"{load.path}:{line_number}: expected {len(load.columns)} fields, got {len(row)}.")
+        if subject_index is not None and row[subject_index] not in constants.SUBJECT_POINTS:
+            raise LoadError(f"{load.path}:{line_number}: unknown subject {row[subject_index]!r}.")
+        if year_index is not None and row[year_index].strip() != str(year):
+            raise LoadError(f"{load.path}:{line_number}: year {row[year_index]!r} does not match {year}.")
+        if enrollment_index is not None and not is_enrolled(row[enrollment_index], enrolled_ids):
+            raise LoadError(
+                f"{load.path}:{line_number}: enrollment {row[enrollment_index]!r} is not an enrollment of {year}."
+            )
+        yield row
+
+
+def is_enrolled(value: str, enrolled_ids: Set[int]) -> bool:
+    try:
+        return int(value) in enrolled_ids
+    except ValueError:
+        return False
+
+
+async def csv_chunks(
+        load: TableLoad,
+        source: TextIO,
+        year: int,
+        chunk_rows: int,
+        enrolled_ids: Optional[Set[int]] = None
+) -> AsyncIterator[bytes]:
+    """
+    Re-encode validated rows as CSV in chunks of `chunk_rows`, so memory stays bounded by one chunk
+    regardless of file size.
+    """
+    reader = csv.reader(source)
+    header = [column.strip() for column in next(reader, [])]
+    unknown = set(header) - set(TABLE_COLUMNS[load.table])
+    if not header or unknown:
+        raise LoadError(f"{load.path}: unexpected columns {sorted(unknown) or 'none'}; "
+                        f"expected a header with {', '.join(TABLE_COLUMNS[load.table])}.")
+    if enrolled_ids is not None and "enrollment_id" not in header:
+        raise LoadError(f"{load.path}: the enrollment_id column is required to check rows against {year}.")
+    load.columns = header
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    pending = 0
+    for row in validated_rows(load, reader, year, enrolled_ids):
+        writer.writerow(row)
+        pending += 1
+        if pending == chunk_rows:
+            load.rows += pending
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        load.rows += pending
+        yield buffer.getvalue().encode()
+
+
+async def copy_table(connection: AsyncConnection, load: TableLoad, year: int, chunk_rows: int) -> TableLoad:
+    """
+    Stream one CSV file into its table with COPY, inside the connection's transaction.
+    """
+    raw = await connection.get_raw_connection()
+    started = time.perf_counter()
+    enrolled_ids = None
+    if load.table == "result":
+        # Includes enrollments copied earlier in this transaction
+        result = await connection.execute(text(ENROLLED_IDS), {"year": year})
+        enrolled_ids = set(result.scalars().all())
+    with open(load.path, newline="", encoding="utf-8") as source:
+        chunks = csv_chunks(load, source, year, chunk_rows, enrolled_ids)
+        # Read the header first: COPY needs the column list before the first chunk is sent
+        first = await anext(chunks, None)
+
+        async def stream():
+            if first is not None:
+                yield first
+            async for chunk in chunks:
+                yield chunk
+
+        await raw.driver_connection.copy_to_table(
+            load.table, source=stream(), columns=load.columns, format="csv"
+        )
+    load.seconds = time.perf_counter() - started
+    return load
+
+
+async def load_year(
+        connection: AsyncConnection,
+        directory: str,
+        year: int,
+        replace: bool = False,
+        chunk_rows: int = 50_000
+) -> Tuple[Dict[str, int], List[TableLoad]]:
+    """
+    Load every "<table>.csv" in `directory` for admission `year` in the connection's transaction.
+    With `replace`, the year's existing rows are deleted first so a load can be re-run.
+    Returns the rows deleted per table and the per-file loads.
+    """
+    loads = find_csv_files(directory)
+
+    # Also starts the transaction on the driver connection before COPY uses it directly
+    await connection.execute(text("SET LOCAL statement_timeout = 0"))
+    deleted: Dict[str, int] = {}
+    if replace:
+        for table, statement in DELETE_YEAR:
+            result = await connection.execute(text(statement), {"year": year})
+            deleted[table] = result.rowcount
+
+    for load in loads:
+        await copy_table(connection, load, year, chunk_rows)
+
+    for load in loads:
+        table = '"grant"' if load.table == "grant" else load.table
+        await connection.execute(text(f"ANALYZE {table}"))
+
+    return deleted, loads
+
+
+def summary(loads: List[TableLoad], elapsed: Optional[float] = None) -> str:
+    rows = sum(load.rows for load in loads)
+    seconds = elapsed if elapsed is not None else sum(load.seconds for load in loads)
+    return f"{rows} rows in {seconds:.2f}s ({rows / seconds if seconds else 0:,.0f} rows/s)"
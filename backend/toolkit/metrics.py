@@ -0,0 +1,271 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from backend.toolkit.statements import statements
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus exposition format.
+    """
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series: Dict[Tuple[Tuple[str, str], ...], List[float]] = {}  # labels -> bucket counts + [sum, count]
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self._series.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels(key + (('le', str(bound)),))} {cumulative:g}")
+            lines.append(f"{self.name}_bucket{format_labels(key + (('le', '+Inf'),))} {series[-1]:g}")
+            lines.append(f"{self.name}_sum{format_labels(key)} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{format_labels(key)} {series[-1]:g}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def values(self) -> Dict[Tuple[Tuple[str, str], ...], float]:
+        return dict(self._values)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{format_labels(key)} {value:g}" for key, value in sorted(self._values.items()))
+        return lines
+
+
+def format_labels(key: Tuple[Tuple[str, str], ...]) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{escape_label(v)}"' for k, v in key) + "}"
+
+
+def escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def gauge(name: str, help_text: str, value: float) -> List[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value:g}"]
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "pool_wait_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+
+
+# Set by MetricsMiddleware for the duration of a request; SQLAlchemy propagates the context into
+# the greenlet that runs cursor events, so the hooks below can attribute queries to the request.
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+http_requests = Counter("http_requests_total", "HTTP requests by route, method and status.")
+http_duration = Histogram("http_request_duration_seconds", "Time from request start until the response is sent.")
+db_queries = Counter("db_queries_total", "SQL statements executed.")
+db_duration = Histogram("db_query_duration_seconds", "Time spent executing SQL statements.")
+db_queries_per_request = Histogram(
+    "db_queries_per_request", "SQL statements per HTTP request.", (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+)
+pool_wait = Histogram("db_pool_wait_seconds", "Time spent waiting for a pooled connection.")
+pool_timeouts = Counter("db_pool_timeouts_total", "Connection checkouts that timed out.")
+prepared_statements = Counter(
+    "db_prepared_statement_cache_total", "Statements found (hit) or not (miss) in the connection's prepared statement cache."
+)
+
+# Extra sections for /metrics, e.g. cache statistics registered by routers
+collectors: List[Callable[[], List[str]]] = []
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long each checkout waited for a connection, labelled with the pool name
+    ("primary" or a replica) set by instrument_engine.
+    """
+
+    metrics_name = "primary"
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_timeouts.inc(pool=self.metrics_name)
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            pool_wait.observe(waited, pool=self.metrics_name)
+            stats = current_request.get()
+            if stats is not None:
+                stats.pool_wait_seconds += waited
+
+
+def instrument_engine(engine, name: str = "primary") -> None:
+    sync_engine = engine.sync_engine
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.metrics_name = name
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+        # The asyncpg dialect keeps an LRU of prepared statements per connection, keyed by the final SQL
+        cache = getattr(getattr(cursor, "_adapt_connection", None), "_prepared_statement_cache", None)
+        if cache is not None:
+            name = statements.name_of(getattr(context, "invoked_statement", None)) or "unregistered"
+            prepared_statements.inc(statement=name, result="hit" if statement in cache else "miss")
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        db_queries.inc(pool=name)
+        db_duration.observe(elapsed, pool=name)
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+        if starts:
+            starts.pop()
+
+
+POOL_GAUGES = (
+    ("db_pool_size", "Configured base pool size (DB_POOL_SIZE).", lambda pool: pool.size()),
+    ("db_pool_max_overflow", "Configured overflow connections (DB_MAX_OVERFLOW).", lambda pool: pool._max_overflow),
+    ("db_pool_checked_out", "Connections currently in use.", lambda pool: pool.checkedout()),
+    ("db_pool_overflow", "Overflow connections currently open.", lambda pool: max(pool.overflow(), 0)),
+    ("db_pool_saturation", "Share of pool capacity in use (checked out / size + max overflow).",
+     lambda pool: pool.checkedout() / max(pool.size() + max(pool._max_overflow, 0), 1)),
+)
+
+
+def pool_gauges(pools: Dict[str, Any]) -> List[str]:
+    """
+    Pool gauges for every engine, labelled by pool name, e.g. db_pool_checked_out{pool="replica-0"} 3.
+    """
+    lines = []
+    for name, help_text, value in POOL_GAUGES:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        lines += [f"{name}{format_labels((('pool', pool_name),))} {value(pool):g}" for pool_name, pool in pools.items()]
+    return lines
+
+
+def cache_gauges(cache_name: str, stats: Dict[str, float]) -> List[str]:
+    """
+    Expose a cache's stats() dict, e.g. {"hits": .., "misses": ..}, as `cache_<key>{cache="<name>"}` lines.
+    """
+    labels = format_labels((("cache", cache_name),))
+    return [f"cache_{key}{labels} {value:g}" for key, value in stats.items()]
+
+
+def prepared_statement_report() -> Dict[str, Dict[str, float]]:
+    """
+    {statement name: {"hits", "misses", "hit_rate"}} from the prepared statement cache counter.
+    """
+    report: Dict[str, Dict[str, float]] = {}
+    for key, value in prepared_statements.values().items():
+        labels = dict(key)
+        entry = report.setdefault(labels["statement"], {"hits": 0, "misses": 0})
+        entry["hits" if labels["result"] == "hit" else "misses"] += value
+    for entry in report.values():
+        entry["hit_rate"] = entry["hits"] / (entry["hits"] + entry["misses"])
+    return report
+
+
+def render(engines: Dict[str, Any]) -> str:
+    lines: List[str] = []
+    for metric in (http_requests, http_duration, db_queries, db_duration, db_queries_per_request,
+                   pool_wait, pool_timeouts, prepared_statements):
+        lines += metric.render()
+    report = prepared_statement_report()
+    hits = sum(entry["hits"] for entry in report.values())
+    lookups = hits + sum(entry["misses"] for entry in report.values())
+    lines += gauge("db_prepared_statement_cache_hit_ratio", "Share of statements served from a prepared statement.",
+                   hits / lookups if lookups else 0)
+    lines += pool_gauges({name: engine.pool for name, engine in engines.items()})
+    for collector in collectors:
+        lines += collector()
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-request query count, DB time, pool wait and handler time.
+    Adds a Server-Timing header, e.g. `db;dur=4.1;desc="3 queries", pool;dur=0.0, app;dur=6.3`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                handler_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries", '
+                    f'pool;dur={stats.pool_wait_seconds * 1000:.1f}, '
+                    f'app;dur={handler_ms:.1f}'
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request.reset(token)
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            http_requests.inc(route=path, method=scope["method"], status=str(status["code"]))
+            http_duration.observe(time.perf_counter() - started, route=path)
+            db_queries_per_request.observe(stats.queries, route=path)
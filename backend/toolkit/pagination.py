@@ -0,0 +1,20 @@
+import base64
+import json
+from typing import Tuple
+
+
+def encode_cursor(faculty_id: str, year: int) -> str:
+    """
+    Encode the (faculty_id, year) sort key of the last returned row as an opaque cursor.
+    """
+    raw = json.dumps([faculty_id, year], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        faculty_id, year = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return str(faculty_id), int(year)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor.") from e
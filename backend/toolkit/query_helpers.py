@@ -1,14 +1,10 @@
 from typing import List, Dict, Tuple, Any, Set
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
 
+from backend.toolkit.statements import statements
 
-async def get_grant_thresholds(subject_name: str, session: AsyncSession) -> List[Dict[str, Any]]:
-    """
-    Fetch minimum grant scores for 50%, 70%, and 100% grants as reference.
-    Refactored to use AsyncSession.
-    """
-    query = text("""
+
+GRANT_THRESHOLDS = statements.register("grant_thresholds", """
     WITH GrantThresholds AS (
         SELECT
             year,
@@ -22,109 +18,43 @@ async def get_grant_thresholds(subject_name: str, session: AsyncSession) -> List
     SELECT *
     FROM GrantThresholds
     ORDER BY year;
-    """)
-    result = await session.execute(query, {"subject_name": subject_name})
-    results = result.mappings().fetchall()
-    return results
-
+""")
 
-async def get_enrollment_thresholds(faculty_id: str, year: int, subject: str, session: AsyncSession) -> Dict[str, Any]:
-    """
-    Fetch min/max contest scores for a given faculty and year, using AsyncSession.
-    """
-    query = text("""
-        SELECT
-            MIN(contest_score) AS min_score,
-            MAX(contest_score) AS max_score
-        FROM enrollment e
-        JOIN result r ON e.student_id = r.enrollment_id
-        WHERE faculty_id = :faculty_id AND year = :year AND r.subject_name = :subject_name
-    """)
-    result = await session.execute(query, {
-        "faculty_id": faculty_id,
-        "year": year,
-        "subject_name": subject
-    })
 
-    row = result.mappings().fetchone()
-
-    if row is None:
-        return {
-            "faculty_id": faculty_id,
-            "year": year,
-            "min_score": None,
-            "max_score": None,
-        }
-
-    return {
-        "faculty_id": faculty_id,
-        "year": year,
-        "min_score": round(row['min_score'], 2) if row['min_score'] is not None else None,
-        "max_score": round(row['max_score'], 2) if row['max_score'] is not None else None,
-    }
-
-
-async def get_total_enrolled_and_rank(session: AsyncSession, faculty_id: str, year: int, score: float,
-                                      elected_subject: str) -> Dict[str, Any]:
+async def get_grant_thresholds(subject_name: str, session: AsyncSession) -> List[Dict[str, Any]]:
     """
-    Fetch total enrolled students and a student's rank, using AsyncSession.
+    Fetch minimum grant scores for 50%, 70%, and 100% grants as reference.
+    Refactored to use AsyncSession.
     """
-    query = text("""
-        SELECT
-            COUNT(*) as total_enrolled,
-            COUNT(*) FILTER (WHERE contest_score > :score) + 1 AS rank
-        FROM enrollment e
-        JOIN result r ON r.enrollment_id = e.student_id
-        WHERE faculty_id = :faculty_id AND year = :year AND r.subject_name = :elected_subject
-    """)
-    result = await session.execute(query, {
-        "score": score,
-        "faculty_id": faculty_id,
-        "year": year,
-        "elected_subject": elected_subject
-    })
-    row = result.mappings().fetchone()
-
-    if row is None:
-        return {"total_enrolled": 0, "rank": 1}
-
-    return row
+    result = await session.execute(GRANT_THRESHOLDS, {"subject_name": subject_name})
+    results = result.mappings().fetchall()
+    return results
 
 
-async def get_faculty_subject_weights(session: AsyncSession, faculty_id: str, year: int, subjects: List[str]) -> List[
-    Dict[str, Any]]:
-    """
-    Fetch subject weights for a faculty in a given year, using AsyncSession.
-    """
-    query = text("""
-            SELECT subject_name, weight, seats
-            FROM faculty_year_subjects
-            WHERE faculty_id = :faculty_id AND year = :year AND subject_name = ANY(:subjects)
-        """)
-
-    result = await session.execute(query, {
-        "faculty_id": faculty_id,
-        "year": year,
-        "subjects": tuple(subjects)
-    })
-    return result.mappings().fetchall()
+ENROLLMENT_STATISTICS = statements.register("enrollment_statistics", """
+    SELECT s.faculty_id, s.year, s.total_enrolled, s.min_score, s.max_score, s.quantiles
+    FROM enrollment_stats s
+    JOIN unnest(CAST(:faculty_ids AS text[]), CAST(:years AS int[])) AS req(faculty_id, year)
+        ON s.faculty_id = req.faculty_id AND s.year = req.year
+    WHERE s.subject_name = :subject_name
+""")
 
 
-async def get_total_capacity(session: AsyncSession, faculty_id: str, year: int) -> int:
+async def get_enrollment_statistics(
+        session: AsyncSession,
+        faculty_keys: List[Tuple[str, int]],
+        subject_name: str
+) -> Dict[Tuple[str, int], Dict[str, Any]]:
     """
-    Fetch the total capacity for a faculty in a given year, using AsyncSession.
+    Fetch precomputed count, min/max and percentile contest scores for many (faculty_id, year) pairs.
+    Faculties without enrolled students for the subject are absent from the result.
     """
-    query = text("""
-        SELECT capacity
-        FROM faculty
-        WHERE id = :faculty_id AND year = :year
-    """)
-    result = await session.execute(query, {
-        "faculty_id": faculty_id,
-        "year": year
+    result = await session.execute(ENROLLMENT_STATISTICS, {
+        "faculty_ids": [faculty_id for faculty_id, _ in faculty_keys],
+        "years": [year for _, year in faculty_keys],
+        "subject_name": subject_name
     })
-    capacity = result.scalar_one_or_none()
-    return capacity if capacity is not None else 0  # Default to 0 if not found
+    return {(row['faculty_id'], row['year']): dict(row) for row in result.mappings().fetchall()}
 
 
 def extract_elected_subject(chosen_subjects: Set[str]) -> str:
@@ -155,3 +85,51 @@ def get_seats_with_subject(weight_rows: List[Dict[str, Any]], fallback_capacity:
         if row['seats'] is not None:
             return row['seats']
     return fallback_capacity
+
+
+FACULTIES_WEIGHTS_AND_CAPACITY = statements.register("faculties_weights_and_capacity", """
+    SELECT
+        req.faculty_id,
+        req.year,
+        f.capacity,
+        fys.subject_name,
+        fys.weight,
+        fys.seats
+    FROM unnest(CAST(:faculty_ids AS text[]), CAST(:years AS int[])) AS req(faculty_id, year)
+    LEFT JOIN faculty f ON f.id = req.faculty_id AND f.year = req.year
+    LEFT JOIN faculty_year_subjects fys
+        ON fys.faculty_id = req.faculty_id
+       AND fys.year = req.year
+       AND fys.subject_name = ANY(:subjects)
+""")
+
+
+async def get_faculties_weights_and_capacity(
+        session: AsyncSession,
+        faculty_keys: List[Tuple[str, int]],
+        subjects: List[str]
+) -> Dict[Tuple[str, int], Dict[str, Any]]:
+    """
+    Fetch subject weights and total capacity for many (faculty_id, year) pairs in a single query.
+    Returns {(faculty_id, year): {"weights": [...], "capacity": int}}.
+    """
+    result = await session.execute(FACULTIES_WEIGHTS_AND_CAPACITY, {
+        "faculty_ids": [faculty_id for faculty_id, _ in faculty_keys],
+        "years": [year for _, year in faculty_keys],
+        "subjects": list(subjects)
+    })
+
+    data: Dict[Tuple[str, int], Dict[str, Any]] = {
+        key: {"weights": [], "capacity": 0} for key in faculty_keys
+    }
+    for row in result.mappings().fetchall():
+        entry = data[(row['faculty_id'], row['year'])]
+        entry["capacity"] = row['capacity'] if row['capacity'] is not None else 0
+        if row['subject_name'] is not None:
+            entry["weights"].append({
+                "subject_name": row['subject_name'],
+                "weight": row['weight'],
+                "seats": row['seats'],
+            })
+    return data
+
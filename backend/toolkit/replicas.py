@@ -0,0 +1,151 @@
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from backend.toolkit import metrics
+
+
+# Errors from the health probe's checkout and SELECT 1; any of them means the replica is unreachable.
+# A pool timeout (exc.TimeoutError) only means the replica is busy.
+PROBE_ERRORS = (exc.DBAPIError, OSError, asyncio.TimeoutError)
+
+replica_fallbacks = metrics.Counter(
+    "db_replica_fallbacks_total", "Times a replica was taken out of read rotation because it was unreachable."
+)
+
+
+def connection_error(error: Optional[BaseException]) -> Optional[BaseException]:
+    """
+    The error in `error`'s chain that means the connection was lost, if any. A failing query (a DBAPIError
+    on a live connection) is not one. The chain is followed because routers re-raise database errors as
+    HTTPException.
+    """
+    while error is not None:
+        if isinstance(error, exc.DBAPIError) and error.connection_invalidated:
+            return error
+        if isinstance(error, (exc.InterfaceError, ConnectionError)):
+            return error
+        error = error.__cause__ or error.__context__
+    return None
+
+
+class Replica:
+    __slots__ = ("name", "engine", "session_factory", "down_until")
+
+    def __init__(self, name: str, engine: AsyncEngine, session_factory: async_sessionmaker):
+        self.name = name
+        self.engine = engine
+        self.session_factory = session_factory
+        self.down_until = 0.0
+
+    @property
+    def up(self) -> bool:
+        return self.down_until <= time.monotonic()
+
+    @property
+    def busy(self) -> int:
+        return self.engine.pool.checkedout()
+
+
+class ReplicaRouter:
+    """
+    Picks the database for read-only sessions: one of the replicas by round robin or fewest checked-out
+    connections, or the primary when no replica is configured or reachable.
+
+    Read sessions are lazy like any other session: a connection is only checked out on first execute, so
+    requests answered from memory never hold one. Replica health is tracked out of band instead: `watch`
+    probes every replica periodically, and a session whose connection is lost marks its replica down too.
+    A replica marked down is skipped for `retry_seconds`, or until a probe succeeds.
+    """
+
+    def __init__(
+            self,
+            primary: Replica,
+            replicas: List[Replica],
+            strategy: str = "round_robin",
+            retry_seconds: float = 30
+    ):
+        if strategy not in ("round_robin", "least_busy"):
+            raise ValueError(f"Unknown replica routing strategy {strategy!r}.")
+        self.primary = primary
+        self.replicas = replicas
+        self.strategy = strategy
+        self.retry_seconds = retry_seconds
+        self._turn = itertools.count()
+
+    def candidates(self) -> List[Replica]:
+        """
+        Healthy replicas in the order they should be tried, followed by the primary.
+        """
+        healthy = [replica for replica in self.replicas if replica.up]
+        if self.strategy == "least_busy":
+            healthy.sort(key=lambda replica: replica.busy)
+        elif healthy:
+            start = next(self._turn) % len(healthy)
+            healthy = healthy[start:] + healthy[:start]
+        return healthy + [self.primary]
+
+    def mark_down(self, replica: Replica, error: BaseException) -> None:
+        if replica is self.primary:
+            return
+        was_up = replica.up
+        replica.down_until = time.monotonic() + self.retry_seconds
+        if was_up:
+            replica_fallbacks.inc(pool=replica.name)
+            print(f"WARNING: Replica {replica.name} unreachable, routing reads elsewhere for "
+                  f"{self.retry_seconds:g}s: {error}")
+
+    def mark_up(self, replica: Replica) -> None:
+        if not replica.up:
+            replica.down_until = 0.0
+            print(f"Replica {replica.name} reachable again, routing reads to it.")
+
+    def replica_of(self, session: AsyncSession) -> Optional[Replica]:
+        return session.info.get("replica")
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        replica = self.candidates()[0]
+        session = replica.session_factory()
+        session.info["replica"] = replica
+        try:
+            yield session
+        except BaseException as e:
+            # A replica that dropped mid-request is skipped by the next requests
+            lost = connection_error(e)
+            if lost is not None:
+                self.mark_down(self.replica_of(session), lost)
+            raise
+        finally:
+            await session.close()
+
+    async def probe(self, replica: Replica) -> None:
+        try:
+            async with replica.engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+        except exc.TimeoutError:
+            return
+        except PROBE_ERRORS as e:
+            self.mark_down(replica, e)
+            return
+        self.mark_up(replica)
+
+    async def watch(self, interval: float) -> None:
+        """
+        Probe every replica each `interval` seconds, taking unreachable ones out of rotation and putting
+        recovered ones back.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.gather(*(self.probe(replica) for replica in self.replicas), return_exceptions=True)
+
+    def gauges(self) -> List[str]:
+        lines = ["# HELP db_replica_up 1 if the replica is taking reads.", "# TYPE db_replica_up gauge"]
+        for replica in self.replicas:
+            lines.append(f"db_replica_up{metrics.format_labels((('pool', replica.name),))} {int(replica.up)}")
+        return lines + replica_fallbacks.render()
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "expires_at")
+
+    def __init__(self, body: bytes, etag: str, expires_at: Optional[float]):
+        self.body = body
+        self.etag = etag
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """
+    LRU cache of serialized response bodies keyed on a normalized request key and the data version.
+    Responses are deterministic for a data snapshot, so the ETag is derived from the key and version
+    and conditional requests can be answered before any work is done.
+
+    Bounded by entry count and optionally by total body size in bytes; entries can also expire after `ttl` seconds.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        return json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+
+    @staticmethod
+    def make_etag(key: str, version: int) -> str:
+        digest = hashlib.sha1(f"{version}:{key}".encode()).hexdigest()[:20]
+        return f'W/"{version}-{digest}"'
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at is not None and entry.expires_at < time.monotonic():
+            self._remove(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, body: bytes, etag: str = "") -> CachedResponse:
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        entry = CachedResponse(body, etag, expires_at)
+        if key in self._entries:
+            self._remove(key)
+        if self.max_bytes is not None and len(body) > self.max_bytes:
+            return entry  # Too large to ever fit, serve it uncached
+
+        self._entries[key] = entry
+        self.size_bytes += len(body)
+        while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.size_bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+        return entry
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.size_bytes -= len(entry.body)
+
+    def clear(self) -> None:
+        self._entries = OrderedDict()
+        self.size_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates: Tuple[str, ...] = tuple(tag.strip() for tag in if_none_match.split(","))
+    # Weak comparison: W/"x" and "x" are equivalent for If-None-Match
+    bare = etag.removeprefix("W/")
+    return "*" in candidates or any(tag.removeprefix("W/") == bare for tag in candidates)
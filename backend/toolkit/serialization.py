@@ -0,0 +1,147 @@
+import codecs
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; the stdlib encoder produces the same JSON
+    orjson = None
+
+
+# Field order of the lean row tuples, matching the response models they stand in for
+FACULTY_ITEM_FIELDS = ("year", "faculty_id", "faculty_name", "university_id", "university_name", "subjects")
+ENROLLMENT_RESULT_FIELDS = (
+    "faculty_id", "year", "contest_score", "thresholds", "rank", "total_enrolled", "total_available",
+    "seats_with_subject"
+)
+SUBJECT_GRANT_FIELDS = ("subject", "grant_score", "grant_amount")
+
+FacultyRow = Tuple[int, str, str, str, str, List[str]]
+EnrollmentRow = Tuple[str, int, float, Dict[str, Any], int, int, int, int]
+GrantRow = Tuple[int, List[Tuple[str, float, int]]]  # (year, [(subject, grant_score, grant_amount)])
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def encode_faculty_page(
+        items: Sequence[FacultyRow],
+        total: Optional[int],
+        limit: int,
+        next_cursor: Optional[str],
+        total_is_estimate: bool
+) -> bytes:
+    """
+    Same JSON as PaginatedFacultyResponse.model_dump_json(), from lean rows without building models.
+    """
+    return dumps({
+        "items": [dict(zip(FACULTY_ITEM_FIELDS, item)) for item in items],
+        "total": total,
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "total_is_estimate": total_is_estimate,
+    })
+
+
+def encode_analyze_response(grants: Sequence[GrantRow], enrollments: Sequence[EnrollmentRow]) -> bytes:
+    """
+    Same JSON as AnalyzeResponse.model_dump_json(), from lean rows without building models.
+    Values are coerced to the model field types, e.g. the thresholds dict (Dict[str, float]) carries
+    faculty_id "1000" and year 2024 but the model emits 1000.0 and 2024.0.
+    """
+    return dumps({
+        "grants": [
+            {
+                "year": int(year),
+                "grants": [
+                    {"subject": subject, "grant_score": float(grant_score), "grant_amount": int(grant_amount)}
+                    for subject, grant_score, grant_amount in subject_grants
+                ]
+            }
+            for year, subject_grants in grants
+        ],
+        "enrollments": [encode_enrollment(row) for row in enrollments],
+    })
+
+
+def encode_enrollment(row: EnrollmentRow) -> Dict[str, Any]:
+    faculty_id, year, contest_score, thresholds, rank, total_enrolled, total_available, seats_with_subject = row
+    return {
+        "faculty_id": str(faculty_id),
+        "year": int(year),
+        "contest_score": float(contest_score),
+        "thresholds": {key: None if value is None else float(value) for key, value in thresholds.items()},
+        "rank": int(rank),
+        "total_enrolled": int(total_enrolled),
+        "total_available": int(total_available),
+        "seats_with_subject": int(seats_with_subject),
+    }
+
+
+class JSONStreamError(ValueError):
+    pass
+
+
+async def iter_json_array(
+        chunks: AsyncIterator[bytes],
+        max_item_chars: int = 1_000_000
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield the objects of a JSON array as they arrive in `chunks`, holding at most one partial item in memory.
+    Raises JSONStreamError for malformed or truncated input once the items before it have been yielded.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    buffer, position = "", 0
+    state = "start"  # start -> first (item or "]") -> separator ("," or "]") / item -> ... -> end
+
+    async def more() -> bool:
+        nonlocal buffer, position
+        async for chunk in chunks:
+            buffer, position = buffer[position:] + text.decode(chunk), 0
+            return True
+        buffer, position = buffer[position:] + text.decode(b"", final=True), 0
+        return False
+
+    exhausted = False
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n":
+            position += 1
+        if position == len(buffer):
+            if exhausted:
+                break
+            exhausted = not await more()
+            continue
+
+        char = buffer[position]
+        if state == "start":
+            if char != "[":
+                raise JSONStreamError("Expected a JSON array.")
+            state, position = "first", position + 1
+        elif state in ("first", "separator") and char == "]":
+            state, position = "end", position + 1
+        elif state == "separator":
+            if char != ",":
+                raise JSONStreamError("Expected ',' or ']' between array items.")
+            state, position = "item", position + 1
+        elif state in ("first", "item"):
+            if char != "{":
+                raise JSONStreamError("Array items must be objects.")
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # An object is only complete once its closing brace arrived, so this is a partial item
+                if exhausted or len(buffer) - position > max_item_chars:
+                    raise JSONStreamError("Malformed, truncated or oversized array item.")
+                exhausted = not await more()
+                continue
+            state = "separator"
+            yield item
+        else:
+            raise JSONStreamError("Unexpected data after the array.")
+
+    if state != "end":
+        raise JSONStreamError("Truncated JSON array.")
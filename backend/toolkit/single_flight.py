@@ -0,0 +1,52 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, TypeVar
+
+from backend.toolkit import metrics
+
+
+T = TypeVar("T")
+
+flight_requests = metrics.Counter(
+    "singleflight_requests_total",
+    "Requests that ran a computation (leader) or shared one already in flight (coalesced)."
+)
+
+
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time; concurrent callers with the same key await the
+    in-flight computation and share its result or exception.
+
+    The computation runs as its own task and is shielded from callers: a leader whose client disconnects
+    doesn't cancel the work the other callers are waiting on. It should therefore not use the caller's
+    request-scoped session but open its own.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is not None:
+            flight_requests.inc(flight=self.name, role="coalesced")
+            return await asyncio.shield(task)
+
+        flight_requests.inc(flight=self.name, role="leader")
+        task = self._calls[key] = asyncio.ensure_future(fn())
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every caller went away before it finished
+        if not task.cancelled():
+            task.exception()
+
+    def gauges(self) -> List[str]:
+        labels = metrics.format_labels((("flight", self.name),))
+        return [f"singleflight_in_flight{labels} {len(self)}"]
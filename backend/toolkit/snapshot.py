@@ -0,0 +1,261 @@
+import json
+import mmap
+import struct
+import time
+from array import array
+from typing import Any, Dict, List, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.toolkit.exam_cache import exam_stats_cache
+from backend.toolkit.grant_index import grant_index
+from backend.toolkit.contest_score_index import contest_score_index
+from backend.toolkit.weight_matrix import faculty_weight_matrix
+
+
+# File layout:
+#   MAGIC (8 bytes) | header length (uint64, little endian) | JSON header | padding to 8 bytes | array data
+# Small tables (exam, faculty, faculty_year_subjects, enrollment_stats counts) live in the JSON header; bulky
+# numeric columns (grant scores/amounts, contest scores, enrollment_stats quantiles) are raw native-endian arrays addressed by offset and length,
+# so they are memory-mapped rather than copied and shared between worker processes through the page cache.
+MAGIC = b"NAECSNP1"
+FORMAT_VERSION = 2
+ARRAY_TYPES = {"grant_scores": "d", "grant_amounts": "i", "contest_scores": "d", "enrollment_quantiles": "d"}
+
+
+async def export_snapshot(session: AsyncSession, path: str) -> Dict[str, Any]:
+    """
+    Export reference and enrollment data into a snapshot file. Returns row counts per table.
+    """
+    exam = (await session.execute(text("""
+        SELECT subject_name, year, mean, standard_deviation, max_score
+        FROM exam
+        ORDER BY subject_name, year
+    """))).fetchall()
+
+    capacities = (await session.execute(text("""
+        SELECT id, year, capacity
+        FROM faculty
+    """))).fetchall()
+
+    faculty_year_subjects = (await session.execute(text("""
+        SELECT faculty_id, year, subject_name, weight, seats
+        FROM faculty_year_subjects
+    """))).fetchall()
+
+    arrays = {name: array(typecode) for name, typecode in ARRAY_TYPES.items()}
+
+    grant_ranges = []
+    grant_rows = await session.stream(text("""
+        SELECT subject_name, year, grant_score, grant_amount
+        FROM "grant"
+        ORDER BY subject_name, year, grant_score, grant_amount
+    """))
+    async for subject_name, year, grant_score, grant_amount in grant_rows:
+        if not grant_ranges or grant_ranges[-1][:2] != [subject_name, year]:
+            grant_ranges.append([subject_name, year, len(arrays["grant_scores"]), 0])
+        arrays["grant_scores"].append(float(grant_score))
+        arrays["grant_amounts"].append(grant_amount)
+        grant_ranges[-1][3] += 1
+
+    # Same rows the contest score index loads per (faculty_id, year, elected_subject), for every subject
+    contest_ranges = []
+    contest_rows = await session.stream(text("""
+        SELECT e.faculty_id, e.year, r.subject_name, contest_score
+        FROM enrollment e
+        JOIN result r ON r.enrollment_id = e.student_id
+        WHERE contest_score IS NOT NULL
+        ORDER BY e.faculty_id, e.year, r.subject_name, contest_score
+    """))
+    async for faculty_id, year, subject_name, contest_score in contest_rows:
+        if not contest_ranges or contest_ranges[-1][:3] != [faculty_id, year, subject_name]:
+            contest_ranges.append([faculty_id, year, subject_name, len(arrays["contest_scores"]), 0])
+        arrays["contest_scores"].append(float(contest_score))
+        contest_ranges[-1][4] += 1
+
+    # Precomputed percentiles behind /analysis/chances and /analysis/best-faculties (migrations/003)
+    enrollment_stats = []
+    stats_rows = await session.stream(text("""
+        SELECT faculty_id, year, subject_name, total_enrolled, min_score, max_score, quantiles
+        FROM enrollment_stats
+        ORDER BY faculty_id, year, subject_name
+    """))
+    async for faculty_id, year, subject_name, total_enrolled, min_score, max_score, quantiles in stats_rows:
+        enrollment_stats.append([
+            faculty_id, year, subject_name, total_enrolled,
+            float(min_score) if min_score is not None else None,
+            float(max_score) if max_score is not None else None,
+            len(arrays["enrollment_quantiles"]), len(quantiles)
+        ])
+        arrays["enrollment_quantiles"].extend(float(value) for value in quantiles)
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "created_at": time.time(),
+        "exam": [
+            [subject_name, year, float(mean), float(sd), float(max_score)]
+            for subject_name, year, mean, sd, max_score in exam
+        ],
+        "capacity": [[faculty_id, year, capacity] for faculty_id, year, capacity in capacities],
+        "faculty_year_subjects": [
+            [faculty_id, year, subject_name, float(weight), seats]
+            for faculty_id, year, subject_name, weight, seats in faculty_year_subjects
+        ],
+        "grant": grant_ranges,
+        "contest_scores": contest_ranges,
+        "enrollment_stats": enrollment_stats,
+        "arrays": {},
+    }
+
+    offset = 0
+    for name, values in arrays.items():
+        header["arrays"][name] = [offset, len(values)]
+        offset += len(values) * values.itemsize
+        offset += -offset % 8
+
+    header_bytes = json.dumps(header, separators=(",", ":")).encode()
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * (-(len(MAGIC) + 8 + len(header_bytes)) % 8))
+        for values in arrays.values():
+            data = values.tobytes()
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 8))
+
+    return {
+        "exam": len(exam),
+        "faculty": len(capacities),
+        "faculty_year_subjects": len(faculty_year_subjects),
+        "grant": len(arrays["grant_scores"]),
+        "contest_scores": len(arrays["contest_scores"]),
+        "enrollment_stats": len(enrollment_stats),
+    }
+
+
+class Snapshot:
+    """
+    Read-only, memory-mapped view of a snapshot written by `export_snapshot`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a data snapshot.")
+        (header_length,) = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        self.header = json.loads(self._mmap[header_start:header_start + header_length])
+        if self.header["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version {self.header['format_version']}.")
+
+        data_start = header_start + header_length
+        data_start += -data_start % 8
+        view = memoryview(self._mmap)
+        self.arrays: Dict[str, memoryview] = {}
+        for name, (offset, length) in self.header["arrays"].items():
+            typecode = ARRAY_TYPES[name]
+            size = length * array(typecode).itemsize
+            self.arrays[name] = view[data_start + offset:data_start + offset + size].cast(typecode)
+
+        self._capacity = {(faculty_id, year): capacity for faculty_id, year, capacity in self.header["capacity"]}
+        self._weights: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+        for faculty_id, year, subject_name, weight, seats in self.header["faculty_year_subjects"]:
+            self._weights.setdefault((faculty_id, year), []).append(
+                {"subject_name": subject_name, "weight": weight, "seats": seats}
+            )
+        self._contest_ranges = {
+            (faculty_id, year, subject_name): (start, length)
+            for faculty_id, year, subject_name, start, length in self.header["contest_scores"]
+        }
+        self._enrollment_stats = {
+            (faculty_id, year, subject_name): (total_enrolled, min_score, max_score, start, length)
+            for faculty_id, year, subject_name, total_enrolled, min_score, max_score, start, length
+            in self.header["enrollment_stats"]
+        }
+
+    def exam_rows(self) -> List[Dict[str, Any]]:
+        return [
+            {"subject_name": subject_name, "year": year, "mean": mean, "standard_deviation": sd, "max_score": max_score}
+            for subject_name, year, mean, sd, max_score in self.header["exam"]
+        ]
+
+    def faculty_year_subject_rows(self) -> List[Dict[str, Any]]:
+        return [
+            {"faculty_id": faculty_id, "year": year, "subject_name": subject_name, "weight": weight, "seats": seats}
+            for faculty_id, year, subject_name, weight, seats in self.header["faculty_year_subjects"]
+        ]
+
+    def grant_arrays(self) -> Dict[Tuple[str, int], Tuple[Sequence[float], Sequence[int]]]:
+        scores, amounts = self.arrays["grant_scores"], self.arrays["grant_amounts"]
+        return {
+            (subject_name, year): (scores[start:start + length], amounts[start:start + length])
+            for subject_name, year, start, length in self.header["grant"]
+        }
+
+    def contest_scores(self, faculty_id: str, year: int, subject_name: str) -> Sequence[float]:
+        start, length = self._contest_ranges.get((faculty_id, year, subject_name), (0, 0))
+        return self.arrays["contest_scores"][start:start + length]
+
+    def faculties_weights_and_capacity(
+            self,
+            faculty_keys: List[Tuple[str, int]],
+            subjects: List[str]
+    ) -> Dict[Tuple[str, int], Dict[str, Any]]:
+        """
+        Same shape as query_helpers.get_faculties_weights_and_capacity.
+        """
+        return {
+            key: {
+                "weights": [row for row in self._weights.get(key, []) if row["subject_name"] in subjects],
+                "capacity": self._capacity.get(key) or 0,
+            }
+            for key in faculty_keys
+        }
+
+    def enrollment_statistics(
+            self,
+            faculty_keys: List[Tuple[str, int]],
+            subject_name: str
+    ) -> Dict[Tuple[str, int], Dict[str, Any]]:
+        """
+        Same shape as query_helpers.get_enrollment_statistics.
+        """
+        quantiles = self.arrays["enrollment_quantiles"]
+        statistics = {}
+        for faculty_id, year in faculty_keys:
+            stats = self._enrollment_stats.get((faculty_id, year, subject_name))
+            if stats is None:
+                continue
+            total_enrolled, min_score, max_score, start, length = stats
+            statistics[(faculty_id, year)] = {
+                "faculty_id": faculty_id,
+                "year": year,
+                "total_enrolled": total_enrolled,
+                "min_score": min_score,
+                "max_score": max_score,
+                "quantiles": quantiles[start:start + length],
+            }
+        return statistics
+
+
+active_snapshot: Snapshot | None = None
+
+
+def activate_snapshot(path: str) -> Snapshot:
+    """
+    Serve exam statistics, grants, faculty weights/capacity, the weight matrix, contest scores and enrollment
+    statistics from a snapshot instead of the database.
+    """
+    global active_snapshot
+    snapshot = Snapshot(path)
+    exam_stats_cache.load(snapshot.exam_rows())
+    grant_index.load(snapshot.grant_arrays())
+    faculty_weight_matrix.load(snapshot.faculty_year_subject_rows())
+    contest_score_index.use_snapshot(snapshot)
+    active_snapshot = snapshot
+    return snapshot
@@ -0,0 +1,53 @@
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+
+
+class StatementRegistry:
+    """
+    Named SQL statements, each built once as a `text()` clause.
+
+    A registered statement always renders to the same SQL string, so SQLAlchemy reuses its compiled form
+    and the asyncpg dialect's per-connection prepared statement cache (keyed by SQL string, sized by
+    DB_PREPARED_STATEMENT_CACHE_SIZE) skips the parse/plan round trip after the first execution.
+    The names label prepared statement cache hits and misses in /metrics (see toolkit.metrics).
+    """
+
+    def __init__(self):
+        self._statements: Dict[str, TextClause] = {}
+        self._names: Dict[int, str] = {}  # id(TextClause) -> name
+        self._by_sql: Dict[str, TextClause] = {}
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def register(self, name: str, sql: str) -> TextClause:
+        if name in self._statements:
+            raise ValueError(f"Statement {name!r} is already registered.")
+        statement = self._statements[name] = self._by_sql[sql] = text(sql)
+        self._names[id(statement)] = name
+        return statement
+
+    def get(self, name: str) -> TextClause:
+        return self._statements[name]
+
+    def shape(self, name: str, sql: str) -> TextClause:
+        """
+        Statement for one shape of a dynamically assembled query, e.g. faculty search with a given set of
+        filters. Callers must derive `name` from the same inputs that determine `sql`, so the number of
+        shapes stays small and fixed.
+        """
+        statement = self._by_sql.get(sql)
+        if statement is None:
+            statement = self.register(name, sql)
+        return statement
+
+    def name_of(self, statement: object) -> Optional[str]:
+        return self._names.get(id(statement))
+
+    def names(self) -> Iterable[str]:
+        return sorted(self._statements)
+
+
+statements = StatementRegistry()
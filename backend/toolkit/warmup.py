@@ -0,0 +1,144 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from backend.toolkit.contest_score_index import CONTEST_SCORES
+from backend.toolkit.data_version import DATA_VERSION
+from backend.toolkit.query_helpers import ENROLLMENT_STATISTICS, FACULTIES_WEIGHTS_AND_CAPACITY
+
+
+# Hot statements run with empty inputs on every pre-opened connection, so each connection has them prepared
+# and asyncpg has introspected the array types they bind before the first real request arrives
+WARM_STATEMENTS = [
+    (CONTEST_SCORES, {"faculty_ids": [], "years": [], "elected_subject": ""}),
+    (FACULTIES_WEIGHTS_AND_CAPACITY, {"faculty_ids": [], "years": [], "subjects": []}),
+]
+
+# Hot statements on tables added by later migrations (002 data_version, 003 enrollment_stats); a database
+# without them still gets its connections warmed
+OPTIONAL_WARM_STATEMENTS = [
+    ("enrollment_statistics", ENROLLMENT_STATISTICS, {"faculty_ids": [], "years": [], "subject_name": ""}),
+    ("data_version", DATA_VERSION, {}),
+]
+
+
+class Readiness:
+    """
+    Warm-up progress reported by GET /ready. The instance only takes traffic once `ready` is set;
+    failed steps are recorded but don't block readiness, since every cache also loads lazily.
+    """
+
+    def __init__(self):
+        self.state = "starting"  # starting -> warming -> ready
+        self.started_at: Optional[float] = None
+        self.duration: Optional[float] = None
+        self.steps: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "state": self.state,
+            "warmup_seconds": round(self.duration, 3) if self.duration is not None else None,
+            "steps": self.steps,
+        }
+
+    async def run_step(self, name: str, step: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        try:
+            result = await step()
+            self.steps[name] = {"ok": True, "seconds": round(time.perf_counter() - started, 3)}
+            return result
+        except Exception as e:
+            self.steps[name] = {"ok": False, "seconds": round(time.perf_counter() - started, 3), "error": str(e)}
+            print(f"WARNING: Warm-up step {name} failed: {e}")
+            return None
+
+
+async def open_pool_connections(engine: AsyncEngine, count: int) -> int:
+    """
+    Check out `count` connections at once so the pool establishes them now rather than on first use,
+    and run the hot statements on each. Returns the number of connections opened.
+    """
+    # Autocommit, like the read sessions: a failed optional statement doesn't abort the rest
+    autocommit_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+    pending = count
+    all_checked_out = asyncio.Event()
+    skipped = set()
+
+    def checked_out() -> None:
+        nonlocal pending
+        pending -= 1
+        if not pending:
+            all_checked_out.set()
+
+    async def warm() -> None:
+        try:
+            connection = await autocommit_engine.connect()
+        finally:
+            checked_out()
+        try:
+            # Each task holds its own connection until every task has one, so the pool opens `count` of them
+            await all_checked_out.wait()
+            for statement, params in WARM_STATEMENTS:
+                await connection.execute(statement, params)
+            for name, statement, params in OPTIONAL_WARM_STATEMENTS:
+                try:
+                    await connection.execute(statement, params)
+                except DBAPIError:
+                    skipped.add(name)
+        finally:
+            await connection.close()
+
+    results = await asyncio.gather(*(warm() for _ in range(count)), return_exceptions=True)
+    if skipped:
+        print(f"WARNING: Warm-up skipped {', '.join(sorted(skipped))} (table missing or not readable).")
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        raise errors[0]
+    return count
+
+
+async def warm_up(
+        readiness: Readiness,
+        engines: Dict[str, AsyncEngine],
+        session_factory: async_sessionmaker,
+        pool_connections: int,
+        loaders: List[Tuple[str, Callable[[AsyncSession], Awaitable[Any]]]]
+) -> None:
+    """
+    Open pool connections on every engine (primary and replicas), then run every loader concurrently,
+    each on its own session.
+    """
+    readiness.state = "warming"
+    readiness.started_at = time.time()
+    started = time.perf_counter()
+
+    async def load(loader):
+        async with session_factory() as session:
+            return await loader(session)
+
+    await asyncio.gather(*(
+        readiness.run_step(
+            f"pool_connections.{name}", lambda engine=engine: open_pool_connections(engine, pool_connections)
+        )
+        for name, engine in engines.items()
+    ))
+    await asyncio.gather(*(
+        readiness.run_step(name, lambda loader=loader: load(loader))
+        for name, loader in loaders
+    ))
+
+    readiness.duration = time.perf_counter() - started
+    readiness.state = "ready"
+    timings = ", ".join(f"{name} {step['seconds']}s" for name, step in readiness.steps.items())
+    print(f"Warm-up complete in {readiness.duration:.2f}s ({timings}).")
+
+
+readiness = Readiness()
@@ -0,0 +1,87 @@
+import asyncio
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class FacultyWeightMatrix:
+    """
+    All faculty subject weights held as per-year matrices (faculties x subjects), so the contest score of
+    every faculty can be computed for one student in a single pass instead of one query per faculty.
+
+    Rows for a given subject combination are built on first use and cached until the next refresh.
+    """
+
+    def __init__(self):
+        # year -> faculty_id -> {subject_name: weight}
+        self._weights: Dict[int, Dict[str, Dict[str, float]]] = {}
+        self._matrices: Dict[Tuple[int, Tuple[str, ...]], Tuple[List[str], List[Tuple[float, ...]]]] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    async def refresh(self, session: AsyncSession) -> int:
+        result = await session.execute(text("""
+            SELECT faculty_id, year, subject_name, weight
+            FROM faculty_year_subjects
+        """))
+        return self.load(result.mappings().fetchall())
+
+    def load(self, rows: Iterable[Mapping[str, Any]]) -> int:
+        count = 0
+        weights: Dict[int, Dict[str, Dict[str, float]]] = {}
+        for row in rows:
+            count += 1
+            weights.setdefault(row['year'], {}).setdefault(row['faculty_id'], {})[row['subject_name']] = float(row['weight'])
+
+        self._weights = weights
+        self._matrices = {}
+        self._loaded = True
+        return count
+
+    async def ensure_loaded(self, session: AsyncSession) -> None:
+        if self._loaded:
+            return
+        async with self._lock:
+            if not self._loaded:
+                await self.refresh(session)
+
+    def invalidate(self) -> None:
+        self._loaded = False
+
+    def years(self) -> List[int]:
+        return sorted(self._weights)
+
+    def matrix(self, year: int, subjects: FrozenSet[str]) -> Tuple[Tuple[str, ...], List[str], List[Tuple[float, ...]]]:
+        """
+        (column order, faculty ids, weight rows) for every faculty of `year` that weighs all of `subjects`,
+        matching the check in check_enrollment_status that a faculty offers each of the student's subjects.
+        """
+        columns = tuple(sorted(subjects))
+        cached = self._matrices.get((year, columns))
+        if cached is None:
+            faculty_ids, rows = [], []
+            for faculty_id, weights in self._weights.get(year, {}).items():
+                if all(subject in weights for subject in columns):
+                    faculty_ids.append(faculty_id)
+                    rows.append(tuple(weights[subject] for subject in columns))
+            cached = self._matrices[(year, columns)] = (faculty_ids, rows)
+        return (columns,) + cached
+
+    def contest_scores(self, year: int, scaled_scores: Dict[str, float]) -> List[Tuple[str, float]]:
+        """
+        (faculty_id, contest score) for every eligible faculty: the weight matrix times the scaled score vector.
+        """
+        columns, faculty_ids, rows = self.matrix(year, frozenset(scaled_scores))
+        vector = tuple(scaled_scores[subject] for subject in columns)
+        return [
+            (faculty_id, round(sum(w * s for w, s in zip(row, vector)), 2))
+            for faculty_id, row in zip(faculty_ids, rows)
+        ]
+
+
+faculty_weight_matrix = FacultyWeightMatrix()